@@ -1,19 +1,145 @@
 import numpy as np
-import random
+import logging
+import time
+from coordinates import CoordinateDistances
+from graph import GraphDistances, SPARSE_DENSITY
+from local_search import improve_tour, tour_length
+from pheromone_store import make_pheromone_store
+
+logger = logging.getLogger(__name__)
+
+
+def nearest_neighbours(distances, k, block_size=1024):
+    """
+    Build the k-nearest-neighbour candidate list of every node
+    
+    Rows are processed in blocks so that only a (block_size, n_nodes) copy
+    of the distance matrix is held at a time.
+    
+    Args:
+        distances: Matrix of distances between nodes
+        k: Number of neighbours per node (capped at n_nodes - 1)
+        block_size: Number of rows partitioned at once
+    
+    Returns:
+        Integer array of shape (n_nodes, k), each row sorted by distance
+    """
+    n_nodes = distances.shape[0]
+    k = max(1, min(k, n_nodes - 1))
+    neighbours = np.empty((n_nodes, k), dtype=np.int64)
+    
+    for start in range(0, n_nodes, block_size):
+        rows = np.arange(start, min(start + block_size, n_nodes))
+        block = np.array(distances[rows], dtype=float)
+        block[np.arange(len(rows)), rows] = np.inf  # A node is not its own neighbour
+        
+        nearest = np.argpartition(block, k - 1, axis=1)[:, :k]
+        order = np.argsort(np.take_along_axis(block, nearest, axis=1), axis=1)
+        neighbours[rows] = np.take_along_axis(nearest, order, axis=1)
+    
+    return neighbours
+
+
+def scan_matrix(distances, block_size=1024):
+    """
+    Check a distance matrix for missing edges and symmetry in row blocks
+    
+    Returns:
+        Tuple of the number of missing edges (non-finite off-diagonal
+        entries), the largest number of existing edges leaving a node, the
+        mean length of the existing edges and whether the matrix equals its
+        transpose
+    """
+    n_nodes = distances.shape[0]
+    n_missing = 0
+    max_degree = 0
+    total = 0.0
+    symmetric = True
+    for start in range(0, n_nodes, block_size):
+        rows = np.arange(start, min(start + block_size, n_nodes))
+        block = np.asarray(distances[rows], dtype=float)
+        edges = np.isfinite(block)
+        edges[np.arange(len(rows)), rows] = False
+        degree = edges.sum(axis=1)
+        n_missing += int((n_nodes - 1 - degree).sum())
+        max_degree = max(max_degree, int(degree.max()))
+        total += float(block[edges].sum())
+        symmetric = symmetric and np.array_equal(block, np.asarray(distances[:, rows], dtype=float).T)
+    n_edges = n_nodes * (n_nodes - 1) - n_missing
+    return n_missing, max_degree, total / max(n_edges, 1), symmetric
+
+
+def spawn_rngs(seed, n):
+    """
+    Create n independent random generators from one seed
+    
+    The generators come from SeedSequence.spawn, so a batch of colonies
+    seeded with them can run concurrently and still be reproduced from
+    the single seed.
+    """
+    return [np.random.default_rng(child) for child in np.random.SeedSequence(seed).spawn(n)]
+
 
 class AntColonyOptimization:
-    def __init__(self, distances, n_ants, n_iterations, decay, alpha=1, beta=2):
+    def __init__(self, distances, n_ants, n_iterations, decay, alpha=1, beta=2,
+                 candidate_k=None, local_search=None, pheromone_store=None,
+                 variant="acs", n_ranked=6, p_best=0.05, stagnation_limit=50,
+                 seed=None, rng=None, symmetric=None):
         """
         Initialize ACO algorithm parameters
         
         Args:
-            distances: Matrix of distances between nodes
+            distances: Matrix of distances between nodes (possibly a memory
+                map, see tsplib.py), a CoordinateDistances (see
+                from_coordinates) or a GraphDistances (see graph.py). Missing
+                edges of a matrix are marked with inf; a sparse one (no node
+                with more than SPARSE_DENSITY of the possible edges) is
+                converted to a GraphDistances, denser ones stay matrices in
+                which missing edges have zero heuristic weight.
             n_ants: Number of ants in the colony
             n_iterations: Maximum number of iterations
             decay: Pheromone evaporation rate (rho)
             alpha: Importance of pheromone trail
             beta: Importance of heuristic information
+            candidate_k: Size of the nearest-neighbour candidate list per node;
+                None scores every unvisited node at every step (on graphs:
+                all existing edges of the node)
+            local_search: Improve tours with 2-opt and Or-opt before the global
+                pheromone update: "best" for the iteration-best tour, "all" for
+                every ant's tour, None to keep the raw tours
+            pheromone_store: "dense" (float64 matrix), "float32" (float32
+                matrix) or "sparse" (candidate edges only); None picks
+                "sparse" for coordinate or memory-mapped input with candidate
+                lists and "dense" otherwise
+            variant: Pheromone update rule: "acs" (local updates and a
+                best-so-far deposit), "mmas" (MAX-MIN Ant System) or "rank"
+                (rank-based Ant System)
+            n_ranked: Weight w of the rank-based variant; the w-1 best ants
+                of an iteration and the best-so-far tour deposit pheromone
+            p_best: MAX-MIN probability of constructing the best tour once
+                pheromone has converged, which sets tau_min
+            stagnation_limit: MAX-MIN iterations without improvement before
+                the pheromone is reset to tau_max
+            seed: Seed (or SeedSequence) of the solver's random generator
+            rng: np.random.Generator used for all sampling; overrides seed
+            symmetric: Whether distances[i, j] == distances[j, i]; None
+                detects it. Asymmetric instances keep separate pheromone
+                trails for the two directions of an edge.
         """
+        # Check matrices for missing edges and symmetry
+        if symmetric is None:
+            symmetric = getattr(distances, "symmetric", None)
+        edge_mean = None
+        if isinstance(distances, np.ndarray):
+            n_missing, max_degree, existing_mean, detected = scan_matrix(distances)
+            if symmetric is None:
+                symmetric = detected
+            if n_missing:
+                edge_mean = existing_mean
+                if max_degree <= SPARSE_DENSITY * (distances.shape[0] - 1):
+                    distances = GraphDistances.from_dense(distances)
+        self.symmetric = symmetric
+        
         self.distances = distances
         self.n_nodes = distances.shape[0]
         self.n_ants = n_ants
@@ -22,139 +148,451 @@ class AntColonyOptimization:
         self.alpha = alpha
         self.beta = beta
         
+        # Every random draw of the solver goes through this generator, so
+        # equal seeds give equal tours
+        self.rng = rng if rng is not None else np.random.default_rng(seed)
+        
+        if variant not in ("acs", "mmas", "rank"):
+            raise ValueError("variant must be 'acs', 'mmas' or 'rank'")
+        self.variant = variant
+        self.n_ranked = n_ranked
+        self.p_best = p_best
+        self.stagnation_limit = stagnation_limit
+        self.iterations_without_improvement = 0
+        
+        # Best tour found so far
+        self.best_path = None
+        self.best_path_length = float('inf')
+        
+        # Tour buffers, allocated once and reused every iteration: the
+        # colony's tours, the visited mask and the best tour so far
+        self.tours = np.empty((n_ants, self.n_nodes + 1), dtype=np.int32)
+        self.visited = np.empty((n_ants, self.n_nodes), dtype=bool)
+        self._ants = np.arange(n_ants)
+        self._best_tour = np.empty(self.n_nodes + 1, dtype=np.int32)
+        
+        # Nearest-neighbour candidate lists; on graphs the k nearest existing
+        # neighbours (all of them without candidate_k), so that ants only
+        # fall back to missing edges when stuck
+        self.candidate_k = candidate_k
+        self.candidates = None
+        if isinstance(distances, GraphDistances):
+            if candidate_k is None:
+                self.candidates = distances.neighbours
+            else:
+                self.candidates = distances.nearest(candidate_k)
+        elif candidate_k is not None:
+            self.candidates = nearest_neighbours(self.distances, candidate_k)
+        
         # Initialize pheromone trails
         # Using the formula τ0 = (n / Ln)^-1 where n is number of nodes
         # and Ln is approximate total distance
-        approx_distance = np.mean(self.distances) * self.n_nodes
-        self.pheromones = np.ones(self.distances.shape) / (self.n_nodes * approx_distance)
+        # (over the existing edges of a matrix with missing ones)
+        if edge_mean is None:
+            edge_mean = self.distances.mean()
+        approx_distance = edge_mean * self.n_nodes
+        self.tau0 = 1 / (self.n_nodes * approx_distance)
+        
+        # The pheromone store also holds the heuristic information η^β and
+        # the choice weights [τ_ij]^α [η_ij]^β, kept current by the updates.
+        # Distances that are not held in memory (coordinates, memory-mapped
+        # matrices) keep edge data only for the candidate edges.
+        # Graphs keep edge data only for their existing edges.
+        out_of_core = isinstance(distances, (CoordinateDistances, np.memmap))
+        if out_of_core and self.candidates is None:
+            logger.warning("No candidate lists (candidate_k) for distances that are not held in "
+                           "memory: the pheromone store and the ants' choices use "
+                           "O(n_nodes²) memory and time")
+        if pheromone_store is None:
+            if isinstance(distances, GraphDistances) or (out_of_core and candidate_k is not None):
+                pheromone_store = "sparse"
+            else:
+                pheromone_store = "dense"
+        self.pheromone_store = make_pheromone_store(pheromone_store, self.distances, self.tau0,
+                                                    self.alpha, self.beta, self.candidates,
+                                                    self.symmetric)
+        self.heuristic_beta = self.pheromone_store.heuristic_beta
         
-        # Heuristic information - inverse of distance
-        self.heuristic = 1 / (self.distances + 1e-10)  # Add small value to avoid division by zero
+        # Local search reuses the candidate lists as its neighbour lists
+        if local_search not in (None, "best", "all"):
+            raise ValueError("local_search must be None, 'best' or 'all'")
+        if local_search is not None and not self.symmetric:
+            raise ValueError("local_search needs a symmetric instance")
+        self.local_search = local_search
+        self.local_search_stats = {"improvement": 0.0, "time_ms": 0.0}
+        if local_search is not None:
+            self.ls_neighbours = self.candidates
+            if self.ls_neighbours is None:
+                self.ls_neighbours = nearest_neighbours(self.distances, 10)
     
-    def select_next_node(self, ant, current_node, unvisited):
+    @classmethod
+    def from_coordinates(cls, xy, n_ants, n_iterations, decay, alpha=1, beta=2,
+                         metric="euclidean", candidate_k=10, **kwargs):
         """
-        Select next node using the Pseudo-Random-Proportional Action Choice Rule
+        Create a solver from node coordinates instead of a distance matrix
+        
+        Distances are computed on the fly (the candidate lists in row blocks),
+        and the sparse pheromone store keeps pheromone and heuristic values
+        only for the candidate edges, so memory grows as
+        O(n_nodes · candidate_k) instead of O(n_nodes²). Edges outside the
+        candidate lists share one evaporating pheromone value and are only
+        used when all candidates are visited.
+        
+        Args:
+            xy: Array of shape (n_nodes, 2) with the node coordinates
+            metric: Distance metric, see coordinates.METRICS
+            candidate_k: Size of the nearest-neighbour candidate list per node
+            Other arguments as for __init__
+        """
+        return cls(CoordinateDistances(xy, metric), n_ants, n_iterations, decay,
+                   alpha=alpha, beta=beta, candidate_k=candidate_k, **kwargs)
+    
+    @property
+    def pheromones(self):
+        """
+        Current pheromone matrix of shape (n_nodes, n_nodes); the sparse
+        store gives shape (n_nodes, k), aligned with self.candidates
+        """
+        if self.pheromone_store.sparse:
+            return self.pheromone_store.pheromones()
+        nodes = np.arange(self.n_nodes)
+        return self.pheromone_store.pheromone(nodes[:, None], nodes)
+
+    def pheromone(self, i, j):
+        """
+        Current pheromone of the edges (i, j) in any store; i and j are
+        node indices or arrays of them
+        """
+        return self.pheromone_store.pheromone(i, j)
+
+    def select_next_nodes(self, current_nodes, visited):
         """
-        if not unvisited:
-            return None
+        Select the next node for every ant at once using the
+        Random-Proportional Action Choice Rule
         
-        # Calculate probabilities for each unvisited node
-        probabilities = []
-        denominator = 0
+        With candidate lists only the k nearest neighbours of the current
+        node are scored; ants whose candidates are all visited fall back to
+        the full set of unvisited nodes.
+
+        Args:
+            current_nodes: Array of shape (n_ants,) with each ant's current node
+            visited: Boolean mask of shape (n_ants, n_nodes) of visited nodes
+
+        Returns:
+            Array of shape (n_ants,) with the selected next nodes
+        """
+        if self.candidates is None:
+            return self._select_from_all(current_nodes, visited)
         
-        for node in unvisited:
-            # Calculate numerator using formula [τ_ij]^α [η_ij]^β
-            numerator = (self.pheromones[current_node, node] ** self.alpha) * \
-                         (self.heuristic[current_node, node] ** self.beta)
-            probabilities.append(numerator)
-            denominator += numerator
+        ants = np.arange(len(current_nodes))[:, None]
+        candidates = self.candidates[current_nodes]
+        weights = self.pheromone_store.candidate_weights(current_nodes, self.candidates)
+        weights = np.where(visited[ants, candidates], 0.0, weights)
+        selected = candidates[ants[:, 0], self._roulette(weights)]
         
-        # Normalize probabilities
-        probabilities = np.array(probabilities) / denominator
+        # Fall back to the full set where no candidate is left
+        exhausted = ~(weights > 0).any(axis=1)
+        if exhausted.any():
+            selected[exhausted] = self._select_from_all(current_nodes[exhausted],
+                                                        visited[exhausted])
+        return selected
+    
+    def _select_from_all(self, current_nodes, visited):
+        """
+        Select the next node among all unvisited nodes
+        """
+        # Weights [τ_ij]^α [η_ij]^β of each ant's row, visited nodes masked out
+        weights = np.where(visited, 0.0, self.pheromone_store.row_weights(current_nodes))
+        selected = self._roulette(weights)
         
-        # Select next node based on calculated probabilities
-        selected = random.choices(unvisited, weights=probabilities, k=1)[0]
+        # Weights may underflow to zero; fall back to the first unvisited node
+        stuck = ~(weights > 0).any(axis=1)
+        if stuck.any():
+            selected[stuck] = np.argmax(~visited[stuck], axis=1)
         return selected
     
+    def _roulette(self, weights):
+        """
+        Batched roulette wheel: one uniform draw per row against the
+        cumulative weights of that row. Returns the selected column per row.
+        """
+        cumulative = np.cumsum(weights, axis=1)
+        draws = self.rng.random(len(weights)) * cumulative[:, -1]
+        return np.argmax(cumulative > draws[:, None], axis=1)
+    
     def local_pheromone_update(self, i, j):
         """
         Update pheromone trails locally using formula:
         τij(t) = (1-ρ)·τij(t-1) + ρ·τ0
+        
+        i and j may be arrays of edge endpoints, one edge per ant.
         """
-        # Calculate initial pheromone value τ0
-        approx_distance = np.mean(self.distances) * self.n_nodes
-        tau_0 = 1 / (self.n_nodes * approx_distance)
+        self._update_edges(i, j, lambda tau: (1 - self.decay) * tau + self.decay * self.tau0)
+    
+    def _update_edges(self, i, j, update):
+        """
+        Apply update to the pheromone of the edges (i, j) and refresh their
+        choice weights; the store applies it to (j, i) as well for
+        symmetric instances
+        """
+        self.pheromone_store.update(i, j, update)
+    
+    def deposit(self, paths, amounts):
+        """
+        Add amounts[r] of pheromone to every edge of paths[r] in a single
+        vectorized update; edges shared by several paths receive the sum
+        """
+        paths = np.asarray(paths, dtype=np.int64)
+        i = paths[:, :-1].ravel()
+        j = paths[:, 1:].ravel()
+        amount = np.repeat(np.asarray(amounts, dtype=float), paths.shape[1] - 1)
+        
+        # Duplicates summed per edge; (i, j) and (j, i) are the same edge of
+        # a symmetric instance
+        if self.symmetric:
+            i, j = np.minimum(i, j), np.maximum(i, j)
+        keys, inverse = np.unique(i * self.n_nodes + j, return_inverse=True)
+        totals = np.bincount(inverse, weights=amount)
         
-        # Update pheromone
-        self.pheromones[i, j] = (1 - self.decay) * self.pheromones[i, j] + self.decay * tau_0
-        self.pheromones[j, i] = self.pheromones[i, j]  # Ensure symmetry
+        self.pheromone_store.update(keys // self.n_nodes, keys % self.n_nodes,
+                                    lambda tau, delta: tau + delta, totals)
     
-    def global_pheromone_update(self, best_path, best_path_length):
+    def global_pheromone_update(self, best_path, best_path_length,
+                                all_paths=None, all_path_lengths=None):
         """
-        Update pheromone trails globally using formula:
-        τij(t) = (1-ρ)·τij(t-1) + ρ·Δτij where Δτij = 1/L+
+        Update pheromone trails globally according to the variant
+        
+        acs:  τij(t) = (1-ρ)·τij(t-1) + ρ·Δτij where Δτij = 1/L+ on the
+              best-so-far tour
+        mmas: τij(t) = (1-ρ)·τij(t-1) + 1/L_ib on the iteration-best tour,
+              bounded to [τmin, τmax]
+        rank: τij(t) = (1-ρ)·τij(t-1) + Σ (w-r)/L_r over the w-1 best tours
+              of the iteration, plus w/L+ on the best-so-far tour
         """
-        # Evaporate pheromone on all edges
-        self.pheromones = (1 - self.decay) * self.pheromones
+        if all_paths is None:
+            all_paths = np.asarray(best_path)[None]
+            all_path_lengths = np.array([best_path_length])
+        
+        if self.variant == "mmas":
+            self._update_bounds(best_path_length)
+        
+        # Evaporate pheromone on all edges (lazily, see pheromone_store.py)
+        self.pheromone_store.evaporate(self.decay)
         
-        # Add new pheromone to the edges of the best path
-        delta_tau = 1.0 / best_path_length
+        if self.variant == "acs":
+            self.deposit([best_path], [self.decay / best_path_length])
         
-        for i in range(len(best_path) - 1):
-            self.pheromones[best_path[i], best_path[i+1]] += self.decay * delta_tau
-            self.pheromones[best_path[i+1], best_path[i]] = self.pheromones[best_path[i], best_path[i+1]]
+        elif self.variant == "mmas":
+            iteration_best = int(np.argmin(all_path_lengths))
+            self.deposit(all_paths[[iteration_best]], [1.0 / all_path_lengths[iteration_best]])
+            
+            # Restart from τmax once the search stagnates
+            if self.iterations_without_improvement >= self.stagnation_limit:
+                self.pheromone_store.reset(self.pheromone_store.tau_max)
+                self.iterations_without_improvement = 0
+        
+        else:
+            ranked = np.argsort(all_path_lengths)[:self.n_ranked - 1]
+            weights = self.n_ranked - 1 - np.arange(len(ranked))
+            paths = np.vstack((all_paths[ranked], np.asarray(best_path)[None]))
+            amounts = np.append(weights / np.asarray(all_path_lengths)[ranked],
+                                self.n_ranked / best_path_length)
+            self.deposit(paths, amounts)
+    
+    def _update_bounds(self, best_path_length):
+        """
+        Set the MAX-MIN pheromone bounds from the best-so-far tour length;
+        the trails start at τmax the first time
+        """
+        if not np.isfinite(best_path_length):
+            return
+        tau_max = 1.0 / (self.decay * best_path_length)
+        root = self.p_best ** (1.0 / self.n_nodes)
+        tau_min = min(tau_max * (1 - root) / (max(self.n_nodes / 2 - 1, 1) * root), tau_max)
+        
+        first = not np.isfinite(self.pheromone_store.tau_max)
+        self.pheromone_store.set_bounds(tau_min, tau_max)
+        if first:
+            self.pheromone_store.reset(tau_max)
     
     def construct_solutions(self):
         """
         Construct solutions for all ants in the colony
+        
+        All ants advance in lockstep: each step picks one next node per ant
+        from a (n_ants, n_nodes) visited mask and, for the ACS variant,
+        applies the local pheromone update to the edges just traversed.
+        
+        Returns:
+            Tuple of the (n_ants, n_nodes + 1) int32 tour array and the tour
+            lengths. The tour array is the reused buffer self.tours, so it
+            is overwritten by the next call.
         """
-        all_paths = []
-        all_path_lengths = []
+        ants = self._ants
+        all_paths = self.tours
+        visited = self.visited
+        visited.fill(False)
         
-        for ant in range(self.n_ants):
-            # Start from a random node
-            current_node = random.randint(0, self.n_nodes - 1)
-            path = [current_node]
-            unvisited = list(range(self.n_nodes))
-            unvisited.remove(current_node)
-            path_length = 0
-            
-            # Construct the complete path
-            while unvisited:
-                next_node = self.select_next_node(ant, current_node, unvisited)
-                path.append(next_node)
-                path_length += self.distances[current_node, next_node]
-                
-                # Local pheromone update
-                self.local_pheromone_update(current_node, next_node)
-                
-                current_node = next_node
-                unvisited.remove(next_node)
+        # Every ant starts from a random node
+        current_nodes = self.rng.integers(0, self.n_nodes, size=self.n_ants)
+        all_paths[:, 0] = current_nodes
+        visited[ants, current_nodes] = True
+        
+        # Construct the complete paths
+        for step in range(1, self.n_nodes):
+            next_nodes = self.select_next_nodes(current_nodes, visited)
+            all_paths[:, step] = next_nodes
+            visited[ants, next_nodes] = True
             
-            # Complete the tour by returning to the starting node
-            path.append(path[0])
-            path_length += self.distances[path[-2], path[0]]
+            # Local pheromone update
+            if self.variant == "acs":
+                self.local_pheromone_update(current_nodes, next_nodes)
             
-            all_paths.append(path)
-            all_path_lengths.append(path_length)
+            current_nodes = next_nodes
+        
+        # Complete the tours by returning to the starting node
+        all_paths[:, -1] = all_paths[:, 0]
+        all_path_lengths = self.distances[all_paths[:, :-1], all_paths[:, 1:]].sum(axis=1)
         
         return all_paths, all_path_lengths
     
-    def run(self):
+    def apply_local_search(self, all_paths, all_path_lengths):
+        """
+        Improve tours in place with 2-opt and Or-opt moves
+        
+        Returns:
+            Tuple of the total tour-length improvement and the time spent in
+            milliseconds
+        """
+        start = time.perf_counter()
+        if self.local_search == "all":
+            ants = range(len(all_paths))
+        else:
+            ants = [int(np.argmin(all_path_lengths))]
+        
+        improvement = 0.0
+        for ant in ants:
+            # Tours that had to use a missing edge are left as they are
+            if not np.isfinite(all_path_lengths[ant]):
+                continue
+            tour, gain = improve_tour(all_paths[ant], self.distances, self.ls_neighbours)
+            all_paths[ant] = tour
+            all_path_lengths[ant] = tour_length(tour, self.distances)
+            improvement += gain
+        
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.local_search_stats["improvement"] += improvement
+        self.local_search_stats["time_ms"] += elapsed_ms
+        return improvement, elapsed_ms
+    
+    def run_iteration(self):
+        """
+        Run one iteration: construct and improve the tours, update the best
+        tour found so far and apply the global pheromone update
+        
+        Returns:
+            Tuple of the iteration-best path (a row of the reused tour
+            buffer) and its length
+        """
+        # Construct solutions for all ants
+        all_paths, all_path_lengths = self.construct_solutions()
+        
+        # Improve the tours before they are used for the global update
+        if self.local_search is not None:
+            self.last_local_search = self.apply_local_search(all_paths, all_path_lengths)
+        
+        # Find the best path in this iteration
+        iteration_best_path_idx = np.argmin(all_path_lengths)
+        iteration_best_path = all_paths[iteration_best_path_idx]
+        iteration_best_path_length = all_path_lengths[iteration_best_path_idx]
+        
+        # Update the best path found so far
+        if not self.accept_tour(iteration_best_path, iteration_best_path_length):
+            self.iterations_without_improvement += 1
+        
+        # Global pheromone update using the best path
+        self.global_pheromone_update(self.best_path, self.best_path_length,
+                                     all_paths, all_path_lengths)
+        
+        return iteration_best_path, iteration_best_path_length
+    
+    def accept_tour(self, path, path_length):
+        """
+        Make path the best tour so far if it is shorter than the current one;
+        tours from other colonies enter the search the same way
+        
+        Returns:
+            Whether the tour was accepted
+        """
+        # The first tour is kept even if it had to use a missing edge
+        if self.best_path is not None and path_length >= self.best_path_length:
+            return False
+        self._best_tour[:] = path
+        self.best_path = self._best_tour
+        self.best_path_length = path_length
+        self.iterations_without_improvement = 0
+        return True
+    
+    def run(self, termination=None, callback=None):
         """
         Run the ACO algorithm
+        
+        Progress is reported through the module logger at INFO level and
+        through callback, so nothing is written to stdout by default.
+        
+        Args:
+            termination: Stopping condition or list of conditions, called
+                as condition(aco, iteration) after every iteration (see
+                termination.py; a start() method, if any, is called when
+                the run begins); the run stops as soon as one holds, and
+                after n_iterations at the latest
+            callback: Called as callback(aco, iteration) after every iteration
+
+        Returns:
+            Tuple of the best tour and its length; (None, inf) if no
+            iteration ran
         """
-        best_path = None
-        best_path_length = float('inf')
+        if termination is None:
+            termination = []
+        elif callable(termination):
+            termination = [termination]
+        # Conditions with state (see termination.py) are reset by start();
+        # plain callables have none
+        for condition in termination:
+            start = getattr(condition, "start", None)
+            if start is not None:
+                start()
+        
+        self.best_path = None
+        self.best_path_length = float('inf')
         
         for iteration in range(self.n_iterations):
-            # Construct solutions for all ants
-            all_paths, all_path_lengths = self.construct_solutions()
+            self.run_iteration()
             
-            # Find the best path in this iteration
-            iteration_best_path_idx = np.argmin(all_path_lengths)
-            iteration_best_path = all_paths[iteration_best_path_idx]
-            iteration_best_path_length = all_path_lengths[iteration_best_path_idx]
+            if callback is not None:
+                callback(self, iteration)
             
-            # Update the best path found so far
-            if iteration_best_path_length < best_path_length:
-                best_path = iteration_best_path
-                best_path_length = iteration_best_path_length
+            if logger.isEnabledFor(logging.INFO):
+                message = f"Iteration {iteration + 1}/{self.n_iterations}, Best length: {self.best_path_length:.2f}"
+                if self.local_search is not None:
+                    improvement, elapsed_ms = self.last_local_search
+                    message += f", Local search gain/ms: {improvement / max(elapsed_ms, 1e-9):.4f}"
+                logger.info(message)
             
-            # Global pheromone update using the best path
-            self.global_pheromone_update(best_path, best_path_length)
-            
-            print(f"Iteration {iteration + 1}/{self.n_iterations}, Best length: {best_path_length:.2f}")
+            if any(condition(self, iteration) for condition in termination):
+                break
         
-        return best_path, best_path_length
+        return (None if self.best_path is None else self.best_path.copy()), self.best_path_length
 
 
 # Example usage for solving TSP
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
     # Create a sample distance matrix (symmetric)
     n_cities = 5
-    np.random.seed(42)
-    distances = np.random.randint(10, 100, size=(n_cities, n_cities))
+    rng = np.random.default_rng(42)
+    distances = rng.integers(10, 100, size=(n_cities, n_cities))
     # Make it symmetric
     distances = (distances + distances.T) / 2
     # Set diagonal to 0
@@ -170,7 +608,8 @@ if __name__ == "__main__":
         n_iterations=20,
         decay=0.1,
         alpha=1,
-        beta=2
+        beta=2,
+        seed=42
     )
     
     best_path, best_path_length = aco.run()
@@ -0,0 +1,114 @@
+import numpy as np
+
+
+def euclidean(a, b):
+    """Euclidean distance between coordinate arrays of shape (..., 2)"""
+    return np.sqrt(np.sum((a - b) ** 2, axis=-1))
+
+
+def manhattan(a, b):
+    """Manhattan distance between coordinate arrays of shape (..., 2)"""
+    return np.sum(np.abs(a - b), axis=-1)
+
+
+def euc_2d(a, b):
+    """TSPLIB EUC_2D: Euclidean distance rounded to the nearest integer"""
+    return np.floor(euclidean(a, b) + 0.5)
+
+
+def ceil_2d(a, b):
+    """TSPLIB CEIL_2D: Euclidean distance rounded up"""
+    return np.ceil(euclidean(a, b))
+
+
+def att(a, b):
+    """TSPLIB ATT: pseudo-Euclidean distance"""
+    r = np.sqrt(np.sum((a - b) ** 2, axis=-1) / 10.0)
+    t = np.floor(r + 0.5)
+    return np.where(t < r, t + 1, t)
+
+
+def geo(a, b):
+    """
+    TSPLIB GEO: great-circle distance in km between (latitude, longitude)
+    pairs given in DDD.MM format
+    """
+    def radians(x):
+        degrees = np.trunc(x)
+        return 3.141592 * (degrees + 5.0 * (x - degrees) / 3.0) / 180.0
+
+    a = radians(a)
+    b = radians(b)
+    q1 = np.cos(a[..., 1] - b[..., 1])
+    q2 = np.cos(a[..., 0] - b[..., 0])
+    q3 = np.cos(a[..., 0] + b[..., 0])
+    cosine = np.clip(0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3), -1.0, 1.0)
+    distance = np.trunc(6378.388 * np.arccos(cosine) + 1.0)
+    # TSPLIB leaves d(i, i) undefined; keep the diagonal at zero
+    return np.where(np.all(a == b, axis=-1), 0.0, distance)
+
+
+METRICS = {
+    "euclidean": euclidean,
+    "manhattan": manhattan,
+    "euc_2d": euc_2d,
+    "ceil_2d": ceil_2d,
+    "att": att,
+    "geo": geo,
+}
+
+
+class CoordinateDistances:
+    """
+    Distance matrix computed on the fly from node coordinates
+
+    Indexing mirrors a dense (n_nodes, n_nodes) array, so the solver can use
+    it in place of one while only the coordinates are held in memory:
+    distances[i, j] computes the distances of the (broadcast) index arrays
+    i and j, and distances[rows] computes whole rows.
+    """
+
+    symmetric = True
+
+    def __init__(self, xy, metric="euclidean"):
+        """
+        Args:
+            xy: Array of shape (n_nodes, 2) with the node coordinates
+            metric: Name of the distance metric, a key of METRICS
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric {metric!r}, expected one of {sorted(METRICS)}")
+        self.xy = np.asarray(xy, dtype=float)
+        self.metric = metric
+        self.shape = (len(self.xy), len(self.xy))
+        self._distance = METRICS[metric]
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            i, j = key
+            return self._distance(self.xy[np.asarray(i)], self.xy[np.asarray(j)])
+        nodes = np.arange(self.shape[0])[key] if isinstance(key, slice) else np.asarray(key)
+        return self._distance(self.xy[nodes][..., None, :], self.xy)
+
+    def mean(self, sample_size=1_000_000, block_size=1024):
+        """
+        Mean distance between all pairs of nodes (including i == j, like the
+        mean of a dense matrix)
+
+        Small instances are averaged exactly in row blocks; for larger ones
+        the mean is estimated from a fixed-seed random sample of pairs.
+        """
+        n_nodes = self.shape[0]
+        if n_nodes * n_nodes <= sample_size:
+            total = 0.0
+            for start in range(0, n_nodes, block_size):
+                total += self[np.arange(start, min(start + block_size, n_nodes))].sum()
+            return total / (n_nodes * n_nodes)
+
+        rng = np.random.default_rng(0)
+        i = rng.integers(0, n_nodes, size=sample_size)
+        j = rng.integers(0, n_nodes, size=sample_size)
+        return float(self[i, j].mean())
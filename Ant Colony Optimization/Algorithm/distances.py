@@ -1,6 +1,9 @@
+import logging
 import numpy as np
 from ant_colony_optimization import AntColonyOptimization  
 
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+
 # 10 cities
 distance_matrix = np.array([
     [  0,  75, 145,  80, 120, 205, 150,  90, 110, 185],
@@ -0,0 +1,151 @@
+import numpy as np
+
+# A matrix with missing (inf) edges is converted to a GraphDistances only
+# if no node has more than this fraction of the possible edges; denser
+# graphs stay matrices
+SPARSE_DENSITY = 0.25
+
+
+class GraphDistances:
+    """
+    Distances of a graph with missing edges, stored as a CSR adjacency
+
+    Indexing mirrors a dense (n_nodes, n_nodes) array in which missing
+    edges are inf: distances[i, j] looks up the (broadcast) index arrays i
+    and j by binary search in the sorted adjacency lists, and
+    distances[rows] expands whole rows. The solver uses the adjacency lists
+    (or the nearest() existing neighbours) as its candidate lists, so ants
+    only move along existing edges.
+    """
+
+    def __init__(self, indptr, indices, data, symmetric=None):
+        """
+        Args:
+            indptr, indices, data: CSR arrays; the edges leaving node i are
+                indices[indptr[i]:indptr[i+1]] with lengths
+                data[indptr[i]:indptr[i+1]]
+            symmetric: Whether every edge (i, j) has a reverse edge (j, i)
+                of the same length; None detects it
+        """
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        n_nodes = len(self.indptr) - 1
+        self.shape = (n_nodes, n_nodes)
+        degree = np.diff(self.indptr)
+        rows = np.repeat(np.arange(n_nodes), degree)
+
+        # Sort every adjacency list by target node; the edge (i, j) is then
+        # found by binary search for the key i * n_nodes + j. The keys end
+        # with a sentinel larger than any edge, whose length is inf.
+        indices = np.asarray(indices, dtype=np.int64)
+        order = np.lexsort((indices, rows))
+        self.indices = indices[order]
+        self.data = np.asarray(data, dtype=float)[order]
+        self._keys = np.append(rows * n_nodes + self.indices, n_nodes * n_nodes)
+        self._lengths = np.append(self.data, np.inf)
+
+        # Adjacency lists padded to the maximum degree. Rows are padded with
+        # the node itself, which is always visited when an ant stands on it,
+        # and the padding has an infinite edge length.
+        max_degree = max(int(degree.max()) if n_nodes else 0, 1)
+        cols = np.arange(len(self.indices)) - np.repeat(self.indptr[:-1], degree)
+        self.neighbours = np.repeat(np.arange(n_nodes)[:, None], max_degree, axis=1)
+        self.neighbours[rows, cols] = self.indices
+        self.edge_distances = np.full((n_nodes, max_degree), np.inf)
+        self.edge_distances[rows, cols] = self.data
+
+        if symmetric is None:
+            forward = rows * n_nodes + self.indices
+            backward = self.indices * n_nodes + rows
+            f = np.argsort(forward)
+            b = np.argsort(backward)
+            symmetric = bool(np.array_equal(forward[f], backward[b]) and
+                             np.array_equal(self.data[f], self.data[b]))
+        self.symmetric = symmetric
+
+    @classmethod
+    def from_dense(cls, matrix, block_size=1024):
+        """
+        Build the CSR adjacency of the finite off-diagonal entries of a
+        dense matrix, reading it in row blocks
+        """
+        n_nodes = matrix.shape[0]
+        indptr = [0]
+        indices = []
+        data = []
+        for start in range(0, n_nodes, block_size):
+            rows = np.arange(start, min(start + block_size, n_nodes))
+            block = np.asarray(matrix[rows], dtype=float)
+            edges = np.isfinite(block)
+            edges[np.arange(len(rows)), rows] = False
+            r, c = np.nonzero(edges)
+            indices.append(c)
+            data.append(block[r, c])
+            indptr.extend(indptr[-1] + np.cumsum(edges.sum(axis=1)))
+        return cls(indptr, np.concatenate(indices), np.concatenate(data))
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            i, j = np.asarray(key[0]), np.asarray(key[1])
+            target = i * self.shape[0] + j
+            pos = np.searchsorted(self._keys, target)
+            values = np.where(self._keys[pos] == target, self._lengths[pos], np.inf)
+            return np.where(i == j, 0.0, values)
+
+        nodes = np.arange(self.shape[0])[key] if isinstance(key, slice) else np.asarray(key)
+        rows = np.atleast_1d(nodes)
+        out = np.full((len(rows), self.shape[0]), np.inf)
+        out[np.arange(len(rows))[:, None], self.neighbours[rows]] = self.edge_distances[rows]
+        out[np.arange(len(rows)), rows] = 0.0
+        return out if nodes.ndim else out[0]
+
+    def nearest(self, k):
+        """
+        Candidate lists of the k nearest existing neighbours of every node,
+        shape (n_nodes, min(k, max_degree)), sorted by distance and padded
+        like neighbours
+        """
+        k = max(1, min(k, self.neighbours.shape[1]))
+        order = np.argsort(self.edge_distances, axis=1, kind="stable")[:, :k]
+        return np.take_along_axis(self.neighbours, order, axis=1)
+
+    def mean(self):
+        """Mean length of the existing edges"""
+        return float(self.data.mean())
+
+
+# Regression check: a dense matrix with a few missing edges stays a matrix
+# and keeps its candidate lists; a sparse one becomes a graph whose lookups
+# agree with the matrix
+if __name__ == "__main__":
+    from ant_colony_optimization import AntColonyOptimization
+    from graph import GraphDistances  # the class the solver uses
+
+    rng = np.random.default_rng(0)
+    xy = rng.random((1500, 2))
+    matrix = np.sqrt(((xy[:, None] - xy[None]) ** 2).sum(axis=-1))
+    matrix[0, 1] = matrix[1, 0] = matrix[5, 9] = matrix[9, 5] = np.inf
+    aco = AntColonyOptimization(matrix, n_ants=10, n_iterations=2, decay=0.1,
+                                candidate_k=10, seed=0)
+    assert isinstance(aco.distances, np.ndarray)
+    assert aco.candidates.shape == (1500, 10)
+    assert not aco.pheromone_store.sparse
+    assert np.isfinite(aco.tau0) and aco.tau0 > 0
+    assert np.isfinite(aco.run()[1])
+
+    sparse = np.where(matrix < 0.05, matrix, np.inf)
+    aco = AntColonyOptimization(sparse, n_ants=10, n_iterations=2, decay=0.1,
+                                candidate_k=5, seed=0)
+    graph = aco.distances
+    assert isinstance(graph, GraphDistances)
+    assert aco.candidates.shape == (1500, 5)
+    nodes = np.arange(1500)[:, None]
+    lengths = np.where(aco.candidates == nodes, np.inf, graph[nodes, aco.candidates])
+    assert np.array_equal(np.sort(sparse, axis=1)[:, 1:6], lengths)
+    i = rng.integers(0, 1500, size=100000)
+    j = rng.integers(0, 1500, size=100000)
+    assert np.array_equal(graph[i, j], np.where(i == j, 0.0, sparse[i, j]))
+    assert np.array_equal(graph[np.arange(3)], np.where(np.eye(1500)[:3] > 0, 0.0, sparse[:3]))
+    print("graph checks passed")
@@ -0,0 +1,174 @@
+import numpy as np
+from collections import deque
+
+# Moves must improve the tour by more than this to be applied
+EPSILON = 1e-10
+
+
+def tour_length(tour, distances):
+    """
+    Length of a closed tour given as a node sequence that ends at its start node
+    """
+    tour = np.asarray(tour)
+    return float(distances[tour[:-1], tour[1:]].sum())
+
+
+def improve_tour(tour, distances, neighbours, or_opt=True, max_segment=3):
+    """
+    Improve a closed tour with 2-opt and Or-opt moves
+
+    Every node has a don't-look bit: only nodes whose bit is off are used
+    as the starting point of a move, and the bit is turned on when no
+    improving move starts there. Applying a move turns the bits of its
+    endpoints off again. The deltas of all moves between a node and its
+    neighbour list are evaluated at once with NumPy.
+
+    Args:
+        tour: Closed tour (node sequence ending at its start node)
+        distances: Matrix of distances between nodes
+        neighbours: Array of shape (n_nodes, k) with the candidate neighbours
+            of every node
+        or_opt: Whether to also try Or-opt segment moves
+        max_segment: Longest segment moved by Or-opt
+
+    Returns:
+        Tuple of the improved closed tour and the tour-length improvement
+    """
+    order = np.array(tour[:-1], dtype=np.int64)
+    n = len(order)
+    if n < 5:
+        return np.asarray(tour), 0.0
+
+    pos = np.empty(n, dtype=np.int64)
+    pos[order] = np.arange(n)
+
+    # Nodes whose don't-look bit is off
+    active = deque(order.tolist())
+    queued = np.ones(n, dtype=bool)
+    improvement = 0.0
+
+    while active:
+        a = active.popleft()
+        queued[a] = False
+
+        delta, touched = _two_opt_move(order, pos, a, distances, neighbours)
+        if delta >= -EPSILON and or_opt:
+            delta, touched = _or_opt_move(order, pos, a, distances, neighbours, max_segment)
+
+        if delta < -EPSILON:
+            improvement -= delta
+            for node in touched:
+                if not queued[node]:
+                    queued[node] = True
+                    active.append(node)
+
+    return np.append(order, order[0]), improvement
+
+
+def _two_opt_move(order, pos, a, distances, neighbours):
+    """
+    Apply the best improving 2-opt move that adds an edge between a and one
+    of its neighbours
+
+    Returns:
+        Tuple of the length delta (0 if no move was applied) and the nodes
+        whose edges changed
+    """
+    n = len(order)
+    i = pos[a]
+    cands = neighbours[a]
+    j = pos[cands]
+    d_ac = distances[a, cands]
+
+    # Successor move: replace (a, a+), (c, c+) with (a, c), (a+, c+)
+    succ_a = order[(i + 1) % n]
+    succ_c = order[(j + 1) % n]
+    delta_succ = d_ac + distances[succ_a, succ_c] - distances[a, succ_a] - distances[cands, succ_c]
+
+    # Predecessor move: replace (a-, a), (c-, c) with (a, c), (a-, c-)
+    pred_a = order[i - 1]
+    pred_c = order[j - 1]
+    delta_pred = d_ac + distances[pred_a, pred_c] - distances[pred_a, a] - distances[pred_c, cands]
+
+    # Padded neighbour lists (see graph.py) may contain a itself
+    delta_succ = np.where(cands == a, np.inf, delta_succ)
+    delta_pred = np.where(cands == a, np.inf, delta_pred)
+
+    s = int(np.argmin(delta_succ))
+    p = int(np.argmin(delta_pred))
+    if min(delta_succ[s], delta_pred[p]) >= -EPSILON:
+        return 0.0, ()
+
+    if delta_succ[s] <= delta_pred[p]:
+        lo, hi = sorted((i, j[s]))
+        _reverse(order, pos, lo + 1, hi + 1)
+        return float(delta_succ[s]), (a, succ_a, cands[s], succ_c[s])
+
+    lo, hi = sorted((i, j[p]))
+    _reverse(order, pos, lo, hi)
+    return float(delta_pred[p]), (a, pred_a, cands[p], pred_c[p])
+
+
+def _or_opt_move(order, pos, a, distances, neighbours, max_segment):
+    """
+    Apply the first improving Or-opt move that relocates the segment of
+    1..max_segment nodes starting at a, possibly reversed, next to one of the
+    neighbours of its end nodes
+
+    Returns:
+        Tuple of the length delta (0 if no move was applied) and the nodes
+        whose edges changed
+    """
+    n = len(order)
+    for length in range(1, max_segment + 1):
+        if n < length + 3:
+            break
+
+        i = pos[a]
+        first = a
+        last = order[(i + length - 1) % n]
+        prev = order[i - 1]
+        nxt = order[(i + length) % n]
+        removal_gain = distances[prev, first] + distances[last, nxt] - distances[prev, nxt]
+
+        # Insert between c and its successor d
+        cands = np.concatenate((neighbours[first], neighbours[last]))
+        offset = (pos[cands] - i) % n
+        succ = order[(pos[cands] + 1) % n]
+        d_cd = distances[cands, succ]
+        forward = distances[cands, first] + distances[last, succ] - d_cd
+        backward = distances[cands, last] + distances[first, succ] - d_cd
+
+        # c must lie outside the segment and must not be its predecessor
+        valid = (offset >= length) & (offset < n - 1)
+        delta = np.where(valid, np.minimum(forward, backward), np.inf) - removal_gain
+
+        best = int(np.argmin(delta))
+        if delta[best] >= -EPSILON:
+            continue
+
+        rolled = np.roll(order, -i)
+        segment = rolled[:length]
+        if backward[best] < forward[best]:
+            segment = segment[::-1]
+        rest = rolled[length:]
+        cut = offset[best] - length + 1
+        order[:] = np.concatenate((rest[:cut], segment, rest[cut:]))
+        pos[order] = np.arange(n)
+        return float(delta[best]), (prev, nxt, first, last, cands[best], succ[best])
+
+    return 0.0, ()
+
+
+def _reverse(order, pos, lo, hi):
+    """
+    Reverse order[lo:hi] in place, or the complementary part of the cyclic
+    tour if that is shorter (both give the same tour)
+    """
+    n = len(order)
+    if hi - lo <= n // 2:
+        idx = np.arange(lo, hi)
+    else:
+        idx = np.arange(hi, lo + n) % n
+    order[idx] = order[idx[::-1]]
+    pos[order[idx]] = idx
@@ -0,0 +1,148 @@
+import numpy as np
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from ant_colony_optimization import AntColonyOptimization, spawn_rngs
+
+# State shared with the colony processes, set by _init_worker
+_shared = {}
+
+
+def run_colonies(distances, n_colonies, n_ants, n_iterations, decay, exchange_interval=10,
+                 topology="ring", seed=None, **kwargs):
+    """
+    Run independent ant colonies in parallel processes that periodically
+    exchange their best tours
+
+    The distance matrix is placed in shared memory once and read by every
+    colony without copying (memory-mapped matrices are reopened from their
+    file instead). Every exchange_interval iterations each colony publishes
+    its best-so-far tour to a shared buffer, waits for the other colonies,
+    and adopts an incoming tour if it is shorter than its own:
+    "ring" passes tours from colony c to colony c+1, "broadcast" gives every
+    colony the best tour of all colonies.
+
+    Args:
+        distances: Distance matrix (or any distance source accepted by
+            AntColonyOptimization)
+        n_colonies: Number of colonies, one process each
+        n_ants, n_iterations, decay: As for AntColonyOptimization
+        exchange_interval: Iterations between best-tour exchanges
+        topology: Migration topology, "ring" or "broadcast"
+        seed: Seed from which the colonies' random generators are spawned;
+            equal seeds give equal results
+        kwargs: Further AntColonyOptimization arguments
+
+    Returns:
+        Tuple of the global best path, its length and an array of shape
+        (n_colonies, n_iterations) with each colony's best-so-far length
+        per iteration
+    """
+    if topology not in ("ring", "broadcast"):
+        raise ValueError("topology must be 'ring' or 'broadcast'")
+    n_nodes = distances.shape[0]
+    rngs = spawn_rngs(seed, n_colonies)
+
+    # Best tour of every colony and its length, exchanged through shared memory
+    tours = shared_memory.SharedMemory(create=True, size=n_colonies * (n_nodes + 1) * 8)
+    lengths = shared_memory.SharedMemory(create=True, size=n_colonies * 8)
+    matrix = None
+    try:
+        if isinstance(distances, np.memmap) and distances.filename is not None:
+            source = ("memmap", distances.filename, distances.offset, distances.dtype.str, distances.shape)
+        elif isinstance(distances, np.ndarray):
+            matrix = shared_memory.SharedMemory(create=True, size=max(distances.nbytes, 1))
+            np.ndarray(distances.shape, dtype=distances.dtype, buffer=matrix.buf)[...] = distances
+            source = ("shared", matrix.name, distances.dtype.str, distances.shape)
+        else:
+            source = ("object", distances)
+
+        barrier = mp.Barrier(n_colonies)
+        shared = (source, tours.name, lengths.name, n_colonies, n_nodes, barrier)
+        aco_args = dict(n_ants=n_ants, n_iterations=n_iterations, decay=decay, **kwargs)
+
+        # All colonies must run at the same time to meet at the exchanges
+        with ProcessPoolExecutor(max_workers=n_colonies, initializer=_init_worker,
+                                 initargs=shared) as executor:
+            futures = [executor.submit(_run_colony, colony, aco_args, exchange_interval,
+                                       topology, rngs[colony])
+                       for colony in range(n_colonies)]
+            results = [future.result() for future in futures]
+    finally:
+        for block in (tours, lengths, matrix):
+            if block is not None:
+                block.close()
+                block.unlink()
+
+    traces = np.array([trace for _, _, trace in results])
+    best = int(np.argmin([length for _, length, _ in results]))
+    return results[best][0], results[best][1], traces
+
+
+def _init_worker(source, tours_name, lengths_name, n_colonies, n_nodes, barrier):
+    """
+    Attach a worker process to the shared distance matrix and exchange
+    buffers
+    """
+    kind = source[0]
+    if kind == "memmap":
+        _, filename, offset, dtype, shape = source
+        distances = np.memmap(filename, dtype=dtype, mode="r", offset=offset, shape=shape)
+    elif kind == "shared":
+        _, name, dtype, shape = source
+        _shared["matrix"] = shared_memory.SharedMemory(name=name)
+        distances = np.ndarray(shape, dtype=dtype, buffer=_shared["matrix"].buf)
+    else:
+        distances = source[1]
+
+    _shared["tours_block"] = shared_memory.SharedMemory(name=tours_name)
+    _shared["lengths_block"] = shared_memory.SharedMemory(name=lengths_name)
+    _shared["distances"] = distances
+    _shared["tours"] = np.ndarray((n_colonies, n_nodes + 1), dtype=np.int64,
+                                  buffer=_shared["tours_block"].buf)
+    _shared["lengths"] = np.ndarray((n_colonies,), dtype=np.float64,
+                                    buffer=_shared["lengths_block"].buf)
+    _shared["barrier"] = barrier
+
+
+def _run_colony(colony, aco_args, exchange_interval, topology, rng):
+    """
+    Run one colony in a worker process, exchanging best tours with the
+    other colonies every exchange_interval iterations
+
+    Returns:
+        Tuple of the colony's best path, its length and its convergence trace
+    """
+    tours = _shared["tours"]
+    lengths = _shared["lengths"]
+    barrier = _shared["barrier"]
+    n_colonies = len(lengths)
+
+    try:
+        aco = AntColonyOptimization(_shared["distances"], rng=rng, **aco_args)
+        trace = np.empty(aco.n_iterations)
+
+        for iteration in range(aco.n_iterations):
+            aco.run_iteration()
+
+            if (iteration + 1) % exchange_interval == 0 and iteration + 1 < aco.n_iterations:
+                tours[colony] = aco.best_path
+                lengths[colony] = aco.best_path_length
+                barrier.wait()
+
+                if topology == "ring":
+                    source = (colony - 1) % n_colonies
+                else:
+                    source = int(np.argmin(lengths))
+                aco.accept_tour(tours[source].copy(), float(lengths[source]))
+
+                # Nobody overwrites its slot before everyone has read
+                barrier.wait()
+
+            trace[iteration] = aco.best_path_length
+    except Exception:
+        # Release the colonies waiting for this one
+        barrier.abort()
+        raise
+
+    return aco.best_path, aco.best_path_length, trace
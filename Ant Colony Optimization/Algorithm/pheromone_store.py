@@ -0,0 +1,276 @@
+import numpy as np
+
+
+class DensePheromoneStore:
+    """
+    Pheromone trails of every directed edge in a dense (n_nodes, n_nodes)
+    array; used for asymmetric instances
+
+    Evaporation is lazy: values are stored relative to one global scale
+    factor, τ_ij = scale · values[i, j], so evaporating every edge only
+    multiplies the scale. The choice weights values^α · η^β are cached per
+    edge; all of them carry the same factor scale^α, which roulette-wheel
+    sampling does not see. Once the scale drops below the precision of the
+    dtype the values are renormalized, one pass over the array every few
+    hundred iterations.
+
+    Optional bounds [tau_min, tau_max] (MAX-MIN Ant System) are enforced
+    lazily as well: tau_max when values are written, since evaporation never
+    raises a value, and tau_min whenever values or weights are read.
+    """
+
+    sparse = False
+    # Whether update() also applies to the reverse edges (j, i)
+    mirror = False
+
+    def __init__(self, distances, tau0, alpha, beta, dtype=np.float64, block_size=1024):
+        """
+        Args:
+            distances: Matrix of distances between nodes
+            tau0: Initial pheromone value
+            alpha: Importance of pheromone trail
+            beta: Importance of heuristic information
+            dtype: Floating point type of the stored arrays
+            block_size: Number of distance rows converted at once
+        """
+        n_nodes = distances.shape[0]
+        self.alpha = alpha
+        self.beta = beta
+        self.distances = distances
+
+        # Heuristic information η^β, filled in row blocks so that no full
+        # float64 temporary of the distance matrix is created
+        self.heuristic_beta = np.empty((n_nodes, n_nodes), dtype=dtype)
+        for start in range(0, n_nodes, block_size):
+            rows = slice(start, min(start + block_size, n_nodes))
+            self.heuristic_beta[rows] = self._heuristic(np.asarray(distances[rows]))
+
+        self.values = np.full((n_nodes, n_nodes), tau0, dtype=dtype)
+        self.weights = (self.values ** alpha) * self.heuristic_beta
+        self.scale = 1.0
+
+        # Stored value of the edges that have no entry of their own
+        self.default_value = tau0
+        self._min_scale = float(np.finfo(dtype).eps)
+        self.tau_min = 0.0
+        self.tau_max = np.inf
+
+    def _heuristic(self, distances):
+        """Heuristic information η^β, the inverse distance raised to β"""
+        return (1 / (distances + 1e-10)) ** self.beta  # Add small value to avoid division by zero
+
+    def index(self, i, j):
+        """
+        Index of the edges (i, j) into the stored arrays, and the selector of
+        the edges that have stored values (all of them for a dense store)
+        """
+        return (i, j), slice(None)
+
+    def pheromones(self):
+        """Pheromone values τ of the stored edges"""
+        return np.maximum(self.values * self.scale, self.tau_min)
+
+    def pheromone(self, i, j):
+        """
+        Pheromone values τ of the edges (i, j), with i and j broadcast
+        against each other; edges without an entry of their own (outside
+        the candidate lists, i == j) have the shared default value
+        """
+        i, j = np.broadcast_arrays(np.asarray(i, dtype=np.intp), np.asarray(j, dtype=np.intp))
+        shape = i.shape
+        i, j = i.ravel(), j.ravel()
+        tau = np.full(i.shape, self.default_value, dtype=np.float64)
+        edges = np.flatnonzero(i != j)
+        idx, stored = self.index(i[edges], j[edges])
+        tau[edges[stored]] = self.values[idx]
+        return np.maximum(tau * self.scale, self.tau_min).reshape(shape)
+
+    def set_bounds(self, tau_min, tau_max):
+        """Keep every pheromone value within [tau_min, tau_max]"""
+        self.tau_min = tau_min
+        self.tau_max = tau_max
+
+    def reset(self, tau):
+        """Set the pheromone of every edge to tau"""
+        self.values.fill(tau)
+        self.weights[...] = (self.values ** self.alpha) * self.heuristic_beta
+        self.default_value = tau
+        self.scale = 1.0
+
+    def _floor(self, weights, heuristic_beta):
+        """Raise weights to those of edges at the lower bound tau_min"""
+        if self.tau_min <= 0:
+            return weights
+        return np.maximum(weights, ((self.tau_min / self.scale) ** self.alpha) * heuristic_beta)
+
+    def update(self, i, j, update, *edge_args):
+        """
+        Replace the pheromone τ of the edges (i, j) by
+        update(τ, *edge_args) and refresh their choice weights
+
+        edge_args are per-edge arrays aligned with i and j; they are passed
+        on for the stored edges only.
+        """
+        if self.mirror:
+            i, j = np.concatenate((i, j)), np.concatenate((j, i))
+            edge_args = tuple(np.concatenate((arg, arg)) for arg in edge_args)
+        idx, stored = self.index(i, j)
+        tau = np.maximum(self.values[idx] * self.scale, self.tau_min)
+        tau = update(tau, *(arg[stored] for arg in edge_args))
+        self.values[idx] = np.clip(tau, self.tau_min, self.tau_max) / self.scale
+        self.weights[idx] = (self.values[idx] ** self.alpha) * self.heuristic_beta[idx]
+
+    def evaporate(self, rho):
+        """Evaporate pheromone on all edges: τ ← (1-ρ)·τ"""
+        self.scale *= 1 - rho
+        if self.scale < self._min_scale:
+            self.values *= self.scale
+            self.weights *= self.scale ** self.alpha
+            self.default_value *= self.scale
+            self.scale = 1.0
+
+    def candidate_weights(self, nodes, candidates):
+        """
+        Choice weights of the candidate edges leaving nodes, shape
+        (len(nodes), k)
+        """
+        idx = nodes[:, None], candidates[nodes]
+        return self._floor(self.weights[idx], self.heuristic_beta[idx])
+
+    def row_weights(self, nodes):
+        """
+        Choice weights of all edges leaving nodes, shape (len(nodes), n_nodes)
+        """
+        return self._floor(self.weights[nodes], self.heuristic_beta[nodes])
+
+
+class TriangularPheromoneStore(DensePheromoneStore):
+    """
+    Pheromone trails of a symmetric instance, stored once per undirected
+    edge as the packed upper triangle of the matrix (half the memory of a
+    dense store)
+
+    Edge (i, j) and edge (j, i) share the entry of (min(i, j), max(i, j)),
+    so symmetric trails need a single write per edge.
+    """
+
+    def __init__(self, distances, tau0, alpha, beta, dtype=np.float64, block_size=1024):
+        n_nodes = distances.shape[0]
+        self.n_nodes = n_nodes
+        self.alpha = alpha
+        self.beta = beta
+        self.distances = distances
+
+        # The upper-triangle entries of a block of rows are contiguous in
+        # the packed order, so η^β is filled block by block
+        self.heuristic_beta = np.empty(n_nodes * (n_nodes - 1) // 2, dtype=dtype)
+        cols = np.arange(n_nodes)
+        for start in range(0, n_nodes, block_size):
+            rows = np.arange(start, min(start + block_size, n_nodes))
+            upper = cols > rows[:, None]
+            offset = self._packed(start, start + 1)
+            block = self._heuristic(np.asarray(distances[rows])[upper])
+            self.heuristic_beta[offset:offset + len(block)] = block
+
+        self.values = np.full(self.heuristic_beta.shape, tau0, dtype=dtype)
+        self.weights = (self.values ** alpha) * self.heuristic_beta
+        self.scale = 1.0
+        self.default_value = tau0
+        self._min_scale = float(np.finfo(dtype).eps)
+        self.tau_min = 0.0
+        self.tau_max = np.inf
+
+    def _packed(self, i, j):
+        """Position of the undirected edge (i, j), i != j, in the packed triangle"""
+        lo = np.minimum(i, j).astype(np.int64)
+        hi = np.maximum(i, j).astype(np.int64)
+        return lo * (2 * self.n_nodes - lo - 1) // 2 + hi - lo - 1
+
+    def index(self, i, j):
+        return self._packed(i, j), slice(None)
+
+    def candidate_weights(self, nodes, candidates):
+        idx = self._packed(nodes[:, None], candidates[nodes])
+        return self._floor(self.weights[idx], self.heuristic_beta[idx])
+
+    def row_weights(self, nodes):
+        cols = np.arange(self.n_nodes)
+        diagonal = nodes[:, None] == cols
+        idx = np.where(diagonal, 0, self._packed(nodes[:, None], cols))
+        weights = self._floor(self.weights[idx], self.heuristic_beta[idx])
+        weights[diagonal] = 0.0
+        return weights
+
+
+class SparsePheromoneStore(DensePheromoneStore):
+    """
+    Pheromone trails of the candidate edges only, as (n_nodes, k) arrays
+    aligned with the candidate lists
+
+    Edges outside the candidate lists share one pheromone value that only
+    evaporates; their heuristic values are computed when a whole row is
+    needed. Candidate lists need not be symmetric, so for symmetric
+    instances (i, j) and (j, i) have separate entries that are updated
+    together.
+    """
+
+    sparse = True
+
+    def __init__(self, distances, tau0, alpha, beta, candidates, symmetric=True,
+                 dtype=np.float64):
+        """
+        Args:
+            candidates: Array of shape (n_nodes, k) with the candidate lists
+            symmetric: Whether updates also apply to the reverse edges
+            Other arguments as for DensePheromoneStore
+        """
+        self.mirror = symmetric
+        self.alpha = alpha
+        self.beta = beta
+        self.distances = distances
+        self.candidates = candidates
+
+        edge_distances = distances[np.arange(len(candidates))[:, None], candidates]
+        self.heuristic_beta = self._heuristic(edge_distances).astype(dtype)
+        self.values = np.full(candidates.shape, tau0, dtype=dtype)
+        self.weights = (self.values ** alpha) * self.heuristic_beta
+        self.scale = 1.0
+        self.default_value = tau0
+        self._min_scale = float(np.finfo(dtype).eps)
+        self.tau_min = 0.0
+        self.tau_max = np.inf
+
+    def index(self, i, j):
+        match = self.candidates[i] == j[:, None]
+        stored = match.any(axis=1)
+        return (i[stored], np.argmax(match[stored], axis=1)), stored
+
+    def candidate_weights(self, nodes, candidates):
+        return self._floor(self.weights[nodes], self.heuristic_beta[nodes])
+
+    def row_weights(self, nodes):
+        heuristic_beta = self._heuristic(self.distances[nodes])
+        return self._floor((self.default_value ** self.alpha) * heuristic_beta, heuristic_beta)
+
+
+def make_pheromone_store(kind, distances, tau0, alpha, beta, candidates=None, symmetric=True):
+    """
+    Create a pheromone store
+
+    Args:
+        kind: "dense" (float64 matrix), "float32" (float32 matrix) or
+            "sparse" (candidate edges only, needs candidates). Dense stores
+            of symmetric instances keep only the upper triangle.
+        symmetric: Whether (i, j) and (j, i) are the same edge
+        Other arguments as for the store classes
+    """
+    dense = TriangularPheromoneStore if symmetric else DensePheromoneStore
+    if kind == "dense":
+        return dense(distances, tau0, alpha, beta)
+    if kind == "float32":
+        return dense(distances, tau0, alpha, beta, dtype=np.float32)
+    if kind == "sparse":
+        if candidates is None:
+            raise ValueError("The sparse pheromone store needs candidate lists (candidate_k)")
+        return SparsePheromoneStore(distances, tau0, alpha, beta, candidates, symmetric)
+    raise ValueError("pheromone_store must be 'dense', 'float32' or 'sparse'")
@@ -0,0 +1,54 @@
+import time
+
+
+class TimeBudget:
+    """
+    Stop once the run has used the given wall-clock time
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self._start = None
+
+    def start(self):
+        self._start = time.perf_counter()
+
+    def __call__(self, aco, iteration):
+        return time.perf_counter() - self._start >= self.seconds
+
+
+class TargetLength:
+    """
+    Stop once the best tour is at most the target length
+    """
+
+    def __init__(self, target):
+        self.target = target
+
+    def start(self):
+        pass
+
+    def __call__(self, aco, iteration):
+        return aco.best_path_length <= self.target
+
+
+class Stagnation:
+    """
+    Stop after the given number of iterations without improvement of the
+    best tour
+    """
+
+    def __init__(self, iterations):
+        self.iterations = iterations
+        self._best = float('inf')
+        self._last_improvement = 0
+
+    def start(self):
+        self._best = float('inf')
+        self._last_improvement = 0
+
+    def __call__(self, aco, iteration):
+        if aco.best_path_length < self._best:
+            self._best = aco.best_path_length
+            self._last_improvement = iteration
+        return iteration - self._last_improvement >= self.iterations
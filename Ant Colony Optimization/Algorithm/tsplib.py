@@ -0,0 +1,134 @@
+import numpy as np
+from coordinates import CoordinateDistances
+
+# TSPLIB EDGE_WEIGHT_TYPE values computed from coordinates, and the metric
+# used for each of them
+COORDINATE_TYPES = {
+    "EUC_2D": "euc_2d",
+    "CEIL_2D": "ceil_2d",
+    "ATT": "att",
+    "GEO": "geo",
+}
+
+# Supported EDGE_WEIGHT_FORMAT values of EXPLICIT instances
+EXPLICIT_FORMATS = ("FULL_MATRIX", "UPPER_ROW", "LOWER_DIAG_ROW")
+
+
+def load_tsplib(path, out=None):
+    """
+    Load a TSPLIB instance as a distance source for AntColonyOptimization
+
+    The file is read line by line into preallocated arrays, so only the
+    parsed values are held in memory.
+
+    Args:
+        path: Path of the .tsp / .atsp file
+        out: Optional path of a .npy file that EXPLICIT matrices are written
+            to (as a memory map) instead of being kept in memory
+
+    Returns:
+        CoordinateDistances for EUC_2D, CEIL_2D, ATT and GEO instances, or a
+        (n_nodes, n_nodes) float array (a read-only memory map if out is
+        given) for EXPLICIT instances
+    """
+    header = {}
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line == "EOF":
+                continue
+
+            section = line.split(":")[0].strip().upper()
+            if section == "NODE_COORD_SECTION":
+                weight_type = header.get("EDGE_WEIGHT_TYPE", "").upper()
+                if weight_type == "EXPLICIT":
+                    _read_coordinates(f, int(header["DIMENSION"]))
+                    continue
+                if weight_type not in COORDINATE_TYPES:
+                    raise ValueError(f"Unsupported EDGE_WEIGHT_TYPE {weight_type!r}")
+                xy = _read_coordinates(f, int(header["DIMENSION"]))
+                return CoordinateDistances(xy, metric=COORDINATE_TYPES[weight_type])
+
+            if section == "EDGE_WEIGHT_SECTION":
+                weight_format = header.get("EDGE_WEIGHT_FORMAT", "").upper()
+                if weight_format not in EXPLICIT_FORMATS:
+                    raise ValueError(f"Unsupported EDGE_WEIGHT_FORMAT {weight_format!r}")
+                return _read_explicit(f, int(header["DIMENSION"]), weight_format, out)
+
+            if ":" in line and not line[0].isdigit():
+                key, value = line.split(":", 1)
+                header[key.strip().upper()] = value.strip()
+
+    raise ValueError(f"{path} has no NODE_COORD_SECTION or EDGE_WEIGHT_SECTION")
+
+
+def load_distance_matrix(path):
+    """
+    Open a precomputed .npy distance matrix as a read-only memory map
+
+    The solver reads rows and gathers edges straight from the file, so the
+    matrix is never copied into memory. Combine it with candidate_k and
+    pheromone_store="sparse" to keep the solver's own memory at
+    O(n_nodes · candidate_k) for matrices larger than RAM.
+    """
+    return np.load(path, mmap_mode="r")
+
+
+def _read_coordinates(lines, dimension):
+    """
+    Read the dimension lines "<node> <x> <y>" of a NODE_COORD_SECTION
+    """
+    xy = np.empty((dimension, 2))
+    for _ in range(dimension):
+        fields = next(lines).split()
+        xy[int(fields[0]) - 1] = float(fields[1]), float(fields[2])
+    return xy
+
+
+def _read_explicit(lines, dimension, weight_format, out):
+    """
+    Read the numbers of an EDGE_WEIGHT_SECTION into a full matrix
+
+    Numbers may be spread over lines in any way, so the section is consumed
+    as one stream of values that fills the rows of the stored triangle or
+    matrix in order.
+    """
+    if out is None:
+        matrix = np.zeros((dimension, dimension))
+    else:
+        matrix = np.lib.format.open_memmap(out, mode="w+", dtype=np.float64,
+                                           shape=(dimension, dimension))
+
+    # Row i of the stored part covers the columns start..stop
+    if weight_format == "FULL_MATRIX":
+        row_columns = lambda i: (0, dimension)
+    elif weight_format == "UPPER_ROW":
+        row_columns = lambda i: (i + 1, dimension)
+    else:
+        row_columns = lambda i: (0, i + 1)
+
+    values = np.empty(0)
+    for row in range(dimension):
+        col, stop = row_columns(row)
+        while col < stop:
+            if not len(values):
+                values = np.array(next(lines).split(), dtype=float)
+                continue
+            take = min(len(values), stop - col)
+            matrix[row, col:col + take] = values[:take]
+            values = values[take:]
+            col += take
+
+    # Mirror the stored triangle
+    if weight_format != "FULL_MATRIX":
+        for i in range(dimension):
+            if weight_format == "UPPER_ROW":
+                matrix[i + 1:, i] = matrix[i, i + 1:]
+            else:
+                matrix[i, i + 1:] = matrix[i + 1:, i]
+
+    if out is not None:
+        matrix.flush()
+        del matrix
+        return load_distance_matrix(out)
+    return matrix
@@ -0,0 +1,41 @@
+# bench_generation.py - per-generation cost of the GA loop with fresh
+# temporaries (run_ga_vectorized) and with preallocated buffers
+# (run_ga_inplace) on a cheap objective, where allocation dominates
+import time
+import numpy as np
+import main
+
+DIMS = (2, 10, 30, 100)
+POP_SIZES = (20, 60, 200)
+MAX_EVALS = 20000
+REPEATS = 5
+
+def sphere(X):
+    return np.sum(X * X, axis=-1)
+
+def time_per_generation(engine, dim):
+    """Best-of-REPEATS wall time of one generation of engine, in µs"""
+    lower = np.full(dim, -5.12)
+    upper = np.full(dim, 5.12)
+    best = np.inf
+    for repeat in range(REPEATS):
+        calls = [0]
+        def func(X):
+            calls[0] += 1
+            return sphere(X)
+        start = time.perf_counter()
+        engine(func, lower, upper, seed=repeat)
+        elapsed = time.perf_counter() - start
+        # one call for the initial population, then one per generation
+        best = min(best, elapsed / max(calls[0] - 1, 1))
+    return best * 1e6
+
+if __name__ == "__main__":
+    main.MAX_EVALS = MAX_EVALS
+    print(f"{'pop':>5} {'dim':>5} {'vectorized µs':>14} {'inplace µs':>11} {'speedup':>8}")
+    for pop_size in POP_SIZES:
+        main.POP_SIZE = pop_size
+        for dim in DIMS:
+            t_vec = time_per_generation(main.run_ga_vectorized, dim)
+            t_inp = time_per_generation(main.run_ga_inplace, dim)
+            print(f"{pop_size:>5} {dim:>5} {t_vec:>14.1f} {t_inp:>11.1f} {t_vec / t_inp:>7.2f}x")
@@ -0,0 +1,202 @@
+# islands.py - island-model GA: one population per worker process, with
+# periodic migration of the best individuals through shared memory
+import numpy as np
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from main import (breed, replace_population, resolve_operators, POP_SIZE, MAX_EVALS, GENERATION_GAP,
+                  REPLACEMENT_MODES, SELECTION_OP, CROSSOVER_OP, MUTATION_OP, INITIAL_SIGMA, SIGMA_BOUNDS)
+
+# State shared with the island processes, set by _init_worker
+_shared = {}
+
+
+def run_island_ga(func, lower, upper, n_islands=4, migration_interval=10, n_migrants=2,
+                  topology="ring", seed=None, max_evals=MAX_EVALS, replacement="generational",
+                  selection=SELECTION_OP, crossover=CROSSOVER_OP, mutation=MUTATION_OP):
+    """
+    Evolve n_islands GA populations of POP_SIZE individuals in parallel
+    processes that periodically exchange their best individuals
+
+    Every island runs the GA operators of run_ga_vectorized (breed) on its
+    own population. Every migration_interval generations each island
+    publishes copies of its n_migrants best individuals to a shared buffer,
+    waits for the other islands, and replaces its worst individuals with
+    the emigrants of its source islands:
+    "ring" receives from island i-1, "torus" from the four neighbours on a
+    2-D grid of islands, and "random" from one island drawn anew at every
+    migration (the same draw in every process).
+
+    All islands run the same number of generations so that they meet at
+    every migration; unchanged children are not re-evaluated, so an island
+    uses at most about max_evals evaluations.
+
+    Args:
+        func: Vectorized objective, reducing over the last axis
+        lower, upper: Bounds of the search space, shape (dim,)
+        n_islands: Number of islands, one process each
+        migration_interval: Generations between migrations
+        n_migrants: Individuals sent by every island per migration
+        topology: Migration topology, "ring", "torus" or "random"
+        seed: Seed from which the islands' random generators are spawned;
+            equal seeds give equal results
+        max_evals: Evaluation budget of every island
+        replacement: Survivor selection of the islands, see
+            main.replace_population
+        selection, crossover, mutation: GA operators, see main.SELECTION_OP;
+            callables must be picklable (defined at module level). With
+            self-adaptive mutation the step sizes migrate with their
+            individuals.
+
+    Returns:
+        Tuple of the best value, its position and an array of shape
+        (n_islands, n_generations) with each island's best-so-far value per
+        generation
+    """
+    if topology not in ("ring", "torus", "random"):
+        raise ValueError("topology must be 'ring', 'torus' or 'random'")
+    if replacement not in REPLACEMENT_MODES:
+        raise ValueError(f"replacement must be one of {REPLACEMENT_MODES}")
+    if topology == "random":
+        n_sources = 1
+    else:
+        n_sources = max(len(migration_sources(i, n_islands, topology, None)) for i in range(n_islands))
+    if n_migrants * n_sources > POP_SIZE:
+        raise ValueError("n_migrants is too large for the population size and topology")
+
+    dim = int(lower.shape[0])
+    if getattr(resolve_operators(selection, crossover, mutation)[2], "self_adaptive", False):
+        # step sizes as a last column, see main.run_ga_vectorized
+        lower = np.append(lower, SIGMA_BOUNDS[0])
+        upper = np.append(upper, SIGMA_BOUNDS[1])
+    width = int(lower.shape[0])
+    n_children = max(1, round(GENERATION_GAP * POP_SIZE)) if replacement == "steady" else POP_SIZE
+    n_generations = -(-(max_evals - POP_SIZE) // n_children)
+    seeds = np.random.SeedSequence(seed).spawn(n_islands + 1)
+    rngs = [np.random.default_rng(s) for s in seeds[:-1]]
+    topology_seed = seeds[-1]
+
+    # Emigrants of every island and their fitness, exchanged through shared memory
+    positions = shared_memory.SharedMemory(create=True, size=n_islands * n_migrants * width * 8)
+    values = shared_memory.SharedMemory(create=True, size=n_islands * n_migrants * 8)
+    try:
+        barrier = mp.Barrier(n_islands)
+        shared = (positions.name, values.name, n_islands, n_migrants, width, barrier)
+
+        # All islands must run at the same time to meet at the migrations
+        with ProcessPoolExecutor(max_workers=n_islands, initializer=_init_worker,
+                                 initargs=shared) as executor:
+            futures = [executor.submit(_run_island, island, func, lower, upper, dim, n_generations,
+                                       migration_interval, topology, rngs[island], topology_seed,
+                                       replacement, n_children, (selection, crossover, mutation))
+                       for island in range(n_islands)]
+            results = [future.result() for future in futures]
+    finally:
+        for block in (positions, values):
+            block.close()
+            block.unlink()
+
+    traces = np.array([trace for _, _, trace in results])
+    best = int(np.argmin([val for val, _, _ in results]))
+    return results[best][0], results[best][1], traces
+
+
+def migration_sources(island, n_islands, topology, rng):
+    """
+    Islands whose emigrants island receives at one migration
+
+    rng is the topology generator shared (by seed) by all islands; the
+    "random" topology draws one permutation from it per migration.
+    """
+    if topology == "ring":
+        sources = {(island - 1) % n_islands}
+    elif topology == "torus":
+        # Most square grid of rows x cols islands
+        rows = max(r for r in range(1, int(np.sqrt(n_islands)) + 1) if n_islands % r == 0)
+        cols = n_islands // rows
+        r, c = divmod(island, cols)
+        sources = {((r - 1) % rows) * cols + c, ((r + 1) % rows) * cols + c,
+                   r * cols + (c - 1) % cols, r * cols + (c + 1) % cols}
+    else:
+        sources = {int(rng.permutation(n_islands)[island])}
+    sources.discard(island)
+    return sorted(sources)
+
+
+def _init_worker(positions_name, values_name, n_islands, n_migrants, width, barrier):
+    """Attach a worker process to the shared migration buffers"""
+    _shared["positions_block"] = shared_memory.SharedMemory(name=positions_name)
+    _shared["values_block"] = shared_memory.SharedMemory(name=values_name)
+    _shared["positions"] = np.ndarray((n_islands, n_migrants, width), dtype=np.float64,
+                                      buffer=_shared["positions_block"].buf)
+    _shared["values"] = np.ndarray((n_islands, n_migrants), dtype=np.float64,
+                                   buffer=_shared["values_block"].buf)
+    _shared["barrier"] = barrier
+
+
+def _run_island(island, func, lower, upper, dim, n_generations, migration_interval, topology,
+                rng, topology_seed, replacement, n_children, operators):
+    """
+    Evolve one island in a worker process, exchanging migrants with the
+    other islands every migration_interval generations
+
+    lower and upper bound every column of the population; columns beyond
+    dim hold the step sizes of self-adaptive mutation.
+
+    Returns:
+        Tuple of the island's best value, its position and its convergence
+        trace
+    """
+    positions = _shared["positions"]
+    values = _shared["values"]
+    barrier = _shared["barrier"]
+    n_islands, n_migrants, width = positions.shape
+    topology_rng = np.random.default_rng(topology_seed)
+    selection, crossover, mutation = resolve_operators(*operators)
+
+    try:
+        pop = rng.uniform(lower[:dim], upper[:dim], size=(POP_SIZE, dim))
+        if width > dim:
+            pop = np.column_stack((pop, np.full(POP_SIZE, INITIAL_SIGMA)))
+        fitness = np.asarray(func(pop[:, :dim]), dtype=float)
+        best_idx = int(np.argmin(fitness))
+        best_val = float(fitness[best_idx])
+        best_x = pop[best_idx, :dim].copy()
+        trace = np.empty(n_generations)
+
+        for generation in range(n_generations):
+            children, winners, changed = breed(pop, fitness, lower, upper, rng, n_children,
+                                               selection, crossover, mutation)
+            child_f = fitness[winners]
+            if changed.any():
+                child_f[changed] = func(children[changed, :dim])
+            pop, fitness = replace_population(pop, fitness, children, child_f, replacement)
+
+            if (generation + 1) % migration_interval == 0 and generation + 1 < n_generations:
+                best_k = np.argpartition(fitness, n_migrants - 1)[:n_migrants]
+                positions[island] = pop[best_k]
+                values[island] = fitness[best_k]
+                barrier.wait()
+
+                # Immigrants replace the worst individuals
+                sources = migration_sources(island, n_islands, topology, topology_rng)
+                if sources:
+                    incoming_f = values[sources].ravel()
+                    worst = np.argpartition(fitness, -len(incoming_f))[-len(incoming_f):]
+                    pop[worst] = positions[sources].reshape(-1, width)
+                    fitness[worst] = incoming_f
+
+                # Nobody overwrites its emigrants before everyone has read
+                barrier.wait()
+
+            idx = int(np.argmin(fitness))
+            if fitness[idx] < best_val:
+                best_val = float(fitness[idx])
+                best_x = pop[idx, :dim].copy()
+            trace[generation] = best_val
+    except Exception:
+        # Release the islands waiting for this one
+        barrier.abort()
+        raise
+
+    return best_val, best_x, trace
@@ -1,6 +1,13 @@
-﻿import numpy as np
-import pandas as pd
+﻿import os
+import sys
+import numpy as np
 from benchfunc import funcs_vec
+# benchmark.py, the sweep runner shared by the GA and PSO harnesses, is in
+# the repository root
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir))
+from benchmark import run_benchmark, open_result_store, RunTimer, default_checkpoints, save_traces
+from operators import get_operator, sample_sites, tournament, SELECTION, CROSSOVER, MUTATION, INITIAL_SIGMA, SIGMA_BOUNDS
+from functools import partial
 import time
 from IPython.display import display
 
@@ -11,126 +18,398 @@ POP_SIZE = 60
 MAX_EVALS = 20000
 TOURNAMENT_SIZE = 3
 N_RUNS = 10
+# survivor selection of run_ga_vectorized and run_ga_batched (the benchmark
+# sweep): "generational" (children replace the population),
+# "elitist" (the ELITE_K best parents replace the worst children), "plus"
+# ((mu+lambda): the best POP_SIZE of parents and children) or "steady"
+# (GENERATION_GAP * POP_SIZE children per generation replace the worst
+# individuals)
+REPLACEMENT = "generational"
+ELITE_K = 2
+GENERATION_GAP = 0.1
+REPLACEMENT_MODES = ("generational", "elitist", "plus", "steady")
+# operators of run_ga_vectorized and run_ga_batched (the benchmark sweep):
+# names from the registries in operators.py
+# (selection: "tournament", "sus"; crossover: "blend", "blx_alpha", "sbx",
+# "uniform"; mutation: "gaussian", "polynomial", "self_adaptive") or kernels
+# with the same signature
+SELECTION_OP = "tournament"
+CROSSOVER_OP = "blend"
+MUTATION_OP = "gaussian"
 
-rng_global = np.random.default_rng()
+# benchmark sweep: root seed (None for a fresh one), worker processes
+# (None for all cores) and runs per job chunk
+SEED = None
+N_WORKERS = None
+CHUNK_SIZE = 5
+# measure the peak memory of every chunk (about twice as slow)
+TRACE_MEMORY = False
+# evaluation counts at which every run's best-so-far value is traced
+CHECKPOINTS = default_checkpoints(POP_SIZE, MAX_EVALS)
+# per-run results are appended here as they finish; a rerun skips the
+# runs already stored (delete the store to start over)
+RESULTS_STORE = "ga_benchmark_results"
 
-def run_ga_vectorized(func, lower, upper, seed=None):
+def resolve_operators(selection, crossover, mutation):
+    """Look up GA operators by name; tournament selection uses TOURNAMENT_SIZE"""
+    selection = get_operator(SELECTION, selection)
+    if selection is tournament:
+        selection = partial(tournament, size=TOURNAMENT_SIZE)
+    return selection, get_operator(CROSSOVER, crossover), get_operator(MUTATION, mutation)
+
+def breed(pop, fitness, lower, upper, rng, n_children=None,
+          selection=SELECTION_OP, crossover=CROSSOVER_OP, mutation=MUTATION_OP):
+    """
+    Produce n_children (default: one per individual of pop) children with
+    the given selection, crossover and mutation operators (see
+    operators.py), which write into buffers allocated here
+
+    pop may have leading batch dimensions of independent populations, e.g.
+    (n_runs, POP_SIZE, width) with fitness (n_runs, POP_SIZE); the parents
+    of every child come from its own population. lower and upper bound
+    every column of pop, including the step size column of self-adaptive
+    mutation.
+
+    Returns:
+        Tuple of the children, the index of every child's first parent and
+        the mask of children that differ from that parent (crossover or
+        mutation applied)
+    """
+    selection, crossover, mutation = resolve_operators(selection, crossover, mutation)
+    *batch, size, width = pop.shape
+    n = size if n_children is None else n_children
+    
+    # select both parents of every child
+    winners = np.empty((*batch, n), dtype=np.intp)
+    winners2 = np.empty((*batch, n), dtype=np.intp)
+    selection(fitness, rng, winners)
+    selection(fitness, rng, winners2)
+    p1 = np.take_along_axis(pop, winners[..., None], axis=-2)
+    p2 = np.take_along_axis(pop, winners2[..., None], axis=-2)
+    
+    # crossover with probability CROSSOVER_PROB, otherwise a copy of p1
+    do_x = rng.random(size=winners.shape) < CROSSOVER_PROB
+    children = np.empty((*batch, n, width))
+    crossover(p1, p2, rng, children)
+    children[~do_x] = p1[~do_x]
+    
+    # mutation in place, recording the mutated genes
+    mut_mask = np.empty(children.shape, dtype=bool)
+    mutation(children, lower, upper, rng, mut_mask, MUTATION_PROB)
+    
+    np.clip(children, lower, upper, out=children)
+    return children, winners, do_x | mut_mask.any(axis=-1)
+
+def replace_population(pop, fitness, children, child_f, replacement="generational", elite_k=ELITE_K):
+    """
+    Select the next population from the parents and the evaluated children
+
+    Survivors are picked with np.argpartition (no per-individual loops):
+    "generational" returns the children; "elitist" keeps the elite_k best
+    parents in place of the elite_k worst children; "plus" keeps the best
+    len(pop) of parents and children together; "steady" replaces the
+    len(children) worst parents by the children. All arrays may have a
+    leading batch dimension of independent populations, as in breed.
+
+    Returns:
+        Tuple of the next population and its fitness
+    """
+    size = fitness.shape[-1]
+    n = child_f.shape[-1]
+    if replacement == "generational":
+        return children, child_f
+    if replacement == "elitist":
+        k = min(elite_k, n)
+        elite = np.argpartition(fitness, k - 1, axis=-1)[..., :k]
+        worst = np.argpartition(child_f, n - k, axis=-1)[..., -k:]
+        np.put_along_axis(children, worst[..., None],
+                          np.take_along_axis(pop, elite[..., None], axis=-2), axis=-2)
+        np.put_along_axis(child_f, worst, np.take_along_axis(fitness, elite, axis=-1), axis=-1)
+        return children, child_f
+    if replacement == "plus":
+        union = np.concatenate((pop, children), axis=-2)
+        union_f = np.concatenate((fitness, child_f), axis=-1)
+        keep = np.argpartition(union_f, size - 1, axis=-1)[..., :size]
+        return (np.take_along_axis(union, keep[..., None], axis=-2),
+                np.take_along_axis(union_f, keep, axis=-1))
+    if replacement == "steady":
+        worst = np.argpartition(fitness, size - n, axis=-1)[..., -n:]
+        np.put_along_axis(pop, worst[..., None], children, axis=-2)
+        np.put_along_axis(fitness, worst, child_f, axis=-1)
+        return pop, fitness
+    raise ValueError(f"replacement must be one of {REPLACEMENT_MODES}")
+
+def run_ga_vectorized(func, lower, upper, seed=None, timings=None, trace=None,
+                      replacement=REPLACEMENT, selection=SELECTION_OP,
+                      crossover=CROSSOVER_OP, mutation=MUTATION_OP):
+    # timings: optional dict filled with timing counters (see RunTimer)
+    # trace: optional ConvergenceTrace of the best-so-far value
+    # replacement: survivor selection, see replace_population
+    # selection, crossover, mutation: GA operators, see SELECTION_OP
+    if replacement not in REPLACEMENT_MODES:
+        raise ValueError(f"replacement must be one of {REPLACEMENT_MODES}")
+    selection, crossover, mutation = resolve_operators(selection, crossover, mutation)
+    timer = RunTimer(timings)
     rng = np.random.default_rng(seed)
     dim = int(lower.shape[0])
     pop = rng.uniform(lower, upper, size=(POP_SIZE, dim))
+    if getattr(mutation, "self_adaptive", False):
+        # the step size of self-adaptive mutation is carried as a last
+        # column, so it is recombined and selected with its individual
+        pop = np.column_stack((pop, np.full(POP_SIZE, INITIAL_SIGMA)))
+        lower = np.append(lower, SIGMA_BOUNDS[0])
+        upper = np.append(upper, SIGMA_BOUNDS[1])
     # some functions expect 1-D input; ensure func handles batch arrays
-    fitness = func(pop)
+    fitness = timer.evaluate(func, pop[:, :dim])
     evals = POP_SIZE
     best_idx = int(np.argmin(fitness))
     best_val = float(fitness[best_idx])
-    best_x = pop[best_idx].copy()
+    best_x = pop[best_idx, :dim].copy()
+    if trace is not None:
+        trace.record(evals, best_val)
+    
+    # steady state breeds only the generation gap
+    n_children = max(1, round(GENERATION_GAP * POP_SIZE)) if replacement == "steady" else None
     
     while evals < MAX_EVALS:
-        # tournament selection to produce parents
-        cand = rng.integers(0, POP_SIZE, size=(POP_SIZE, TOURNAMENT_SIZE))
-        cand_f = fitness[cand]
-        winners = cand[np.arange(POP_SIZE), np.argmin(cand_f, axis=1)]
-        p1 = pop[winners]
+        children, winners, changed = breed(pop, fitness, lower, upper, rng, n_children,
+                                           selection, crossover, mutation)
         
-        cand2 = rng.integers(0, POP_SIZE, size=(POP_SIZE, TOURNAMENT_SIZE))
-        cand_f2 = fitness[cand2]
-        winners2 = cand2[np.arange(POP_SIZE), np.argmin(cand_f2, axis=1)]
-        p2 = pop[winners2]
+        # children without crossover and mutation are copies of their first
+        # parent and keep its fitness; only the others are evaluated and
+        # charged to MAX_EVALS
+        child_f = fitness[winners].astype(float)
+        if changed.any():
+            child_f[changed] = timer.evaluate(func, children[changed, :dim])
+        evals += int(changed.sum())
         
-        # crossover (blend)
-        do_x = rng.random(size=POP_SIZE) < CROSSOVER_PROB
-        alpha = rng.random(size=(POP_SIZE, dim))
-        children = np.where(do_x[:,None], alpha*p1 + (1-alpha)*p2, p1.copy())
+        # update best
+        idx = int(np.argmin(child_f))
+        if child_f[idx] < best_val:
+            best_val = float(child_f[idx])
+            best_x = children[idx, :dim].copy()
+        if trace is not None:
+            trace.record(evals, best_val)
         
-        # mutation gaussian
-        mut_mask = rng.random(size=(POP_SIZE, dim)) < MUTATION_PROB
-        if mut_mask.any():
-            sigma = 0.1 * (upper - lower)
-            noise = rng.normal(0,1,size=(POP_SIZE, dim)) * sigma
-            children = np.where(mut_mask, children + noise, children)
+        pop, fitness = replace_population(pop, fitness, children, child_f, replacement)
+    
+    timer.finish(evals)
+    return best_val, best_x
+
+def run_ga_inplace(func, lower, upper, seed=None, timings=None, trace=None):
+    """
+    run_ga_vectorized with the default configuration (generational
+    replacement, tournament selection, blend crossover, Gaussian mutation)
+    on work buffers allocated once per run
+
+    Every generation writes into the same arrays through ufunc out=
+    arguments, np.take(..., out=) and rng.random(out=) instead of
+    allocating new (POP_SIZE, dim) temporaries; the population and the
+    children swap buffers after each generation. Only the tournament
+    candidates (rng.integers has no out) and the batch of changed children
+    passed to func are allocated per generation, besides the mutation
+    sites, whose number is about MUTATION_PROB * POP_SIZE * dim. The random
+    draws are the same as in run_ga_vectorized, so both return the same
+    result for the same seed.
+
+    Args:
+        func: Vectorized objective, reducing over the last axis
+        lower, upper: Bounds of the search space, shape (dim,)
+        seed: Seed of the random generator
+        timings: Optional dict filled with timing counters (see RunTimer)
+        trace: Optional ConvergenceTrace of the best-so-far value
+
+    Returns:
+        Tuple of the best value and its position
+    """
+    timer = RunTimer(timings)
+    rng = np.random.default_rng(seed)
+    dim = int(lower.shape[0])
+    n, k = POP_SIZE, TOURNAMENT_SIZE
+    pop = rng.uniform(lower, upper, size=(n, dim))
+    fitness = np.asarray(timer.evaluate(func, pop), dtype=float)
+    evals = POP_SIZE
+    best_idx = int(np.argmin(fitness))
+    best_val = float(fitness[best_idx])
+    best_x = pop[best_idx].copy()
+    if trace is not None:
+        trace.record(evals, best_val)
+    
+    # work buffers, reused by every generation
+    children = np.empty((n, dim))
+    child_f = np.empty(n)
+    p1 = np.empty((n, dim))
+    p2 = np.empty((n, dim))
+    tmp = np.empty((n, dim))
+    cand_f = np.empty((n, k))
+    arg = np.empty(n, dtype=np.intp)
+    row_start = np.arange(n) * k
+    winners = np.empty(n, dtype=np.intp)
+    winners2 = np.empty(n, dtype=np.intp)
+    u = np.empty(n)
+    do_x = np.empty(n, dtype=bool)
+    no_x = np.empty(n, dtype=bool)
+    changed = np.empty(n, dtype=bool)
+    sigma = 0.1 * (upper - lower)
+    
+    def select(out):
+        # tournament: flat index of every row's winner in the candidates
+        cand = rng.integers(0, n, size=(n, k))
+        np.take(fitness, cand, out=cand_f)
+        np.argmin(cand_f, axis=1, out=arg)
+        np.add(row_start, arg, out=arg)
+        np.take(cand, arg, out=out)
+    
+    while evals < MAX_EVALS:
+        select(winners)
+        np.take(pop, winners, axis=0, out=p1)
+        select(winners2)
+        np.take(pop, winners2, axis=0, out=p2)
         
-        children = np.clip(children, lower, upper)
-        child_f = func(children)
-        evals += POP_SIZE
+        # crossover (blend): alpha*p1 + (1-alpha)*p2 where do_x, else p1
+        rng.random(out=u)
+        np.less(u, CROSSOVER_PROB, out=do_x)
+        rng.random(out=tmp)
+        np.multiply(tmp, p1, out=children)
+        np.subtract(1, tmp, out=tmp)
+        np.multiply(tmp, p2, out=tmp)
+        np.add(children, tmp, out=children)
+        np.logical_not(do_x, out=no_x)
+        np.copyto(children, p1, where=no_x[:, None])
+        
+        # mutation gaussian, noise only for the sampled sites
+        rows, cols = np.divmod(sample_sites((n, dim), MUTATION_PROB, rng), dim)
+        children[rows, cols] += rng.standard_normal(len(rows)) * sigma[cols]
+        np.clip(children, lower, upper, out=children)
+        
+        # copies of p1 keep its fitness, the others are evaluated
+        np.copyto(changed, do_x)
+        changed[rows] = True
+        np.take(fitness, winners, out=child_f)
+        n_changed = int(np.count_nonzero(changed))
+        if n_changed:
+            child_f[changed] = timer.evaluate(func, children[changed])
+        evals += n_changed
         
-        # update best
         idx = int(np.argmin(child_f))
         if child_f[idx] < best_val:
             best_val = float(child_f[idx])
             best_x = children[idx].copy()
+        if trace is not None:
+            trace.record(evals, best_val)
         
-        pop = children
-        fitness = child_f
+        # generational replacement: swap the buffers
+        pop, children = children, pop
+        fitness, child_f = child_f, fitness
     
+    timer.finish(evals)
     return best_val, best_x
 
-# run experiments
-summary_rows = []
-all_results = []
-print("Starting vectorized GA runs...")
-
-for name, func, low, high, known in funcs_vec:
-    best_vals = np.empty(N_RUNS)
-    best_xs = []
-    
-    for i in range(N_RUNS):
-        seed = rng_global.integers(1_000_000_000)
-        try:
-            bv, bx = run_ga_vectorized(func, low, high, seed=seed)
-        except Exception as e:
-            print(f"  Skipping run due to error evaluating {name}: {e}")
-            bv, bx = np.nan, None
-        best_vals[i] = bv
-        best_xs.append(bx)
-    
-    # Handle case where all runs failed
-    valid_vals = best_vals[~np.isnan(best_vals)]
-    if len(valid_vals) > 0:
-        meanv = float(np.nanmean(best_vals))
-        stdv = float(np.nanstd(best_vals, ddof=1)) if len(valid_vals) > 1 else 0.0
-        idx_best = int(np.nanargmin(best_vals))
-        best_observed_val = float(best_vals[idx_best])
-        best_observed_x = np.round(best_xs[idx_best], 6).tolist() if best_xs[idx_best] is not None else None
-    else:
-        meanv = np.nan
-        stdv = np.nan
-        best_observed_val = np.nan
-        best_observed_x = None
-    
-    summary_rows.append({
-        "function": name,
-        "mean_best": round(meanv, 6) if not np.isnan(meanv) else np.nan,
-        "std_best": round(stdv, 6) if not np.isnan(stdv) else np.nan,
-        "best_observed_val": best_observed_val,
-        "best_observed_x": best_observed_x,
-        "known_min": known
-    })
-    
-    all_results.append({"function": name, "best_vals": best_vals, "best_xs": best_xs})
-    
-    if len(valid_vals) > 0:
-        print(f"{name}: mean={meanv:.6g}, std={stdv:.6g}, best={np.nanmin(best_vals):.6g}")
-    else:
-        print(f"{name}: All runs failed - no valid results")
-
-df = pd.DataFrame(summary_rows)
-display(df)
-
-# per-run table
-rows = []
-for r in all_results:
-    row = {"function": r["function"]}
-    for i, val in enumerate(r["best_vals"], start=1):
-        if not np.isnan(val):
-            row[f"run_{i}"] = float(np.round(val, 8))
-        else:
-            row[f"run_{i}"] = np.nan
-    rows.append(row)
+def run_ga_batched(func, lower, upper, n_runs, seeds=None, timings=None, trace=None,
+                   replacement=REPLACEMENT, selection=SELECTION_OP, crossover=CROSSOVER_OP,
+                   mutation=MUTATION_OP):
+    """
+    Run n_runs independent GAs at once on a (n_runs, POP_SIZE, dim) array
+
+    Selection, crossover, mutation (breed) and survivor selection
+    (replace_population), with the same options as run_ga_vectorized, are
+    applied to all runs together, and fitness is evaluated once per
+    generation on the changed children of all runs, flattened to one
+    (n, dim) array. Runs never exchange individuals.
+    As in run_ga_vectorized, unchanged copies of parents are not evaluated
+    again, so every run has its own evaluation count; runs that have used
+    up MAX_EVALS keep their population until all runs are done.
+    The random draws of all runs come from one generator seeded with seeds,
+    so results are reproducible but differ from run_ga_vectorized.
+
+    Args:
+        func: Vectorized objective, reducing over the last axis
+        lower, upper: Bounds of the search space, shape (dim,)
+        n_runs: Number of independent runs
+        seeds: Seed (or sequence of seeds) of the random generator
+        timings: Optional dict filled with the timing counters of all runs
+            together (see RunTimer)
+        trace: Optional ConvergenceTrace with one row per run
+        replacement: Survivor selection, see replace_population
+        selection, crossover, mutation: GA operators, see SELECTION_OP
 
-df_runs = pd.DataFrame(rows)
-display(df_runs)
+    Returns:
+        Tuple of the best values, shape (n_runs,), and the best positions,
+        shape (n_runs, dim)
+    """
+    if replacement not in REPLACEMENT_MODES:
+        raise ValueError(f"replacement must be one of {REPLACEMENT_MODES}")
+    selection, crossover, mutation = resolve_operators(selection, crossover, mutation)
+    timer = RunTimer(timings)
+    rng = np.random.default_rng(seeds)
+    dim = int(lower.shape[0])
+    runs = np.arange(n_runs)[:, None]
+    pop = rng.uniform(lower, upper, size=(n_runs, POP_SIZE, dim))
+    if getattr(mutation, "self_adaptive", False):
+        # step sizes as a last column, see run_ga_vectorized
+        pop = np.concatenate((pop, np.full((n_runs, POP_SIZE, 1), INITIAL_SIGMA)), axis=2)
+        lower = np.append(lower, SIGMA_BOUNDS[0])
+        upper = np.append(upper, SIGMA_BOUNDS[1])
+    fitness = np.asarray(timer.evaluate(func, pop[..., :dim].reshape(-1, dim))).reshape(n_runs, POP_SIZE)
+    evals = np.full(n_runs, POP_SIZE)
+    best_idx = np.argmin(fitness, axis=1)
+    best_val = fitness[runs[:, 0], best_idx]
+    best_x = pop[runs[:, 0], best_idx, :dim]
+    if trace is not None:
+        trace.record(evals, best_val)
+    
+    # steady state breeds only the generation gap
+    n_children = max(1, round(GENERATION_GAP * POP_SIZE)) if replacement == "steady" else None
+    
+    while (evals < MAX_EVALS).any():
+        active = evals < MAX_EVALS
+        
+        children, winners, changed = breed(pop, fitness, lower, upper, rng, n_children,
+                                           selection, crossover, mutation)
+        
+        # evaluate only the changed children of the active runs; copies of
+        # p1 keep its fitness
+        changed &= active[:, None]
+        child_f = np.take_along_axis(fitness, winners, axis=1).astype(float)
+        if changed.any():
+            child_f[changed] = timer.evaluate(func, children[changed][:, :dim])
+        evals += changed.sum(axis=1)
+        
+        # update best of every active run
+        active_f = np.where(active[:, None], child_f, np.inf)
+        idx = np.argmin(active_f, axis=1)
+        improved = active_f[runs[:, 0], idx] < best_val
+        best_val = np.where(improved, active_f[runs[:, 0], idx], best_val)
+        best_x = np.where(improved[:, None], children[runs[:, 0], idx, :dim], best_x)
+        if trace is not None:
+            trace.record(evals, best_val)
+        
+        # survivor selection; finished runs keep their population
+        if active.all():
+            pop, fitness = replace_population(pop, fitness, children, child_f, replacement)
+        else:
+            pop[active], fitness[active] = replace_population(
+                pop[active], fitness[active], children[active], child_f[active], replacement)
+    
+    timer.finish(int(evals.sum()))
+    return best_val, best_x
 
-# Save summary CSV
-csv_path = "ga_benchmark_results_summary_vectorized.csv"
-df.to_csv(csv_path, index=False)
-print("Saved summary CSV to:", csv_path)
+# run experiments
+if __name__ == "__main__":
+    print("Starting vectorized GA runs...")
+    store = open_result_store(RESULTS_STORE)
+    df, df_runs, traces = run_benchmark(run_ga_batched, funcs_vec, N_RUNS, store, seed=SEED,
+                                max_workers=N_WORKERS, chunk_size=CHUNK_SIZE,
+                                trace_memory=TRACE_MEMORY, checkpoints=CHECKPOINTS)
+    display(df)
+    display(df_runs)
+    
+    # Save summary CSV
+    csv_path = "ga_benchmark_results_summary_vectorized.csv"
+    df.to_csv(csv_path, index=False)
+    print("Saved summary CSV to:", csv_path)
+    
+    # Save convergence traces next to the CSV
+    traces_path = "ga_benchmark_traces.npz"
+    save_traces(traces_path, CHECKPOINTS, traces)
+    print("Saved convergence traces to:", traces_path)
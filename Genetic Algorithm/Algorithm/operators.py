@@ -0,0 +1,173 @@
+# operators.py - vectorized GA operator kernels and their registries
+#
+# Every kernel works on a whole population at once, draws from the rng it
+# is given and writes its result into a preallocated out buffer:
+#   selection(fitness, rng, out)            out: parent indices, shape (n,)
+#   crossover(p1, p2, rng, out)             out: children, shape (n, width)
+#   mutation(x, lower, upper, rng, out, p)  mutates x in place; out: bool
+#                                           mask of the mutated genes
+# Arrays may have leading batch dimensions, one per independent population
+# (e.g. fitness (n_runs, POP_SIZE) and x (n_runs, n, width)); selection
+# then picks parents within each population. Objectives are minimized.
+# Extra parameters have defaults and can be bound with functools.partial.
+import numpy as np
+
+# Step size (as a fraction of the domain width) of new individuals and the
+# range it is kept in by self-adaptive mutation
+INITIAL_SIGMA = 0.1
+SIGMA_BOUNDS = (1e-8, 1.0)
+
+
+# ----------------------------
+# Sparse sampling
+# ----------------------------
+def sample_sites(shape, p, rng):
+    """
+    Sorted flat indices of the entries of an array of the given shape that
+    are hit independently with probability p
+
+    Draws the number of hits from Binomial(size, p) and then that many
+    distinct indices, so the cost grows with the number of hits rather than
+    with the size of the array. Operators draw their random values only
+    for these sites.
+    """
+    size = int(np.prod(shape))
+    sites = rng.choice(size, size=rng.binomial(size, p), replace=False)
+    sites.sort()
+    return sites
+
+
+# ----------------------------
+# Selection
+# ----------------------------
+def tournament(fitness, rng, out, size=3):
+    """k-tournament selection: the best of size random individuals"""
+    cand = rng.integers(0, fitness.shape[-1], size=out.shape + (size,))
+    cand_f = np.take_along_axis(fitness, cand.reshape(*out.shape[:-1], -1), axis=-1)
+    best = np.argmin(cand_f.reshape(cand.shape), axis=-1)
+    out[...] = np.take_along_axis(cand, best[..., None], axis=-1)[..., 0]
+
+
+def sus(fitness, rng, out):
+    """
+    Stochastic universal sampling: n equally spaced pointers on the
+    roulette wheel of the weights max(f) - f, in random order
+
+    Populations whose weights are all zero or not finite get equal
+    weights.
+    """
+    n = out.shape[-1]
+    size = fitness.shape[-1]
+    with np.errstate(invalid="ignore"):
+        weights = fitness.max(axis=-1, keepdims=True) - fitness
+    total = weights.sum(axis=-1, keepdims=True)
+    valid = np.isfinite(total) & (total > 0)
+    weights = np.where(valid, weights / np.where(valid, total, 1.0), 1.0 / size)
+    # The wheel of population b spans [b, b + 1), so one searchsorted
+    # serves all populations
+    offset = np.arange(int(np.prod(fitness.shape[:-1]))).reshape(fitness.shape[:-1] + (1,))
+    wheel = np.cumsum(weights, axis=-1) + offset
+    pointers = (rng.random(size=offset.shape) + np.arange(n)) / n + offset
+    picks = np.searchsorted(wheel.ravel(), pointers.ravel(), side="right").reshape(out.shape)
+    out[...] = rng.permuted(np.minimum(picks - offset * size, size - 1), axis=-1)
+
+
+# ----------------------------
+# Crossover
+# ----------------------------
+def blend(p1, p2, rng, out):
+    """Arithmetic blend with a uniform weight in [0, 1] per gene"""
+    alpha = rng.random(size=out.shape)
+    np.multiply(alpha, p1, out=out)
+    out += (1 - alpha) * p2
+
+
+def blx_alpha(p1, p2, rng, out, alpha=0.5):
+    """BLX-α: uniform in the parents' interval extended by α on both sides"""
+    u = rng.uniform(-alpha, 1 + alpha, size=out.shape)
+    np.subtract(p2, p1, out=out)
+    out *= u
+    out += p1
+
+
+def sbx(p1, p2, rng, out, eta=15.0):
+    """Simulated binary crossover with distribution index eta (one child)"""
+    u = rng.random(size=out.shape)
+    beta = np.where(u <= 0.5, 2 * u, 1 / (2 * (1 - u))) ** (1 / (eta + 1))
+    np.multiply(1 + beta, p1, out=out)
+    out += (1 - beta) * p2
+    out *= 0.5
+
+
+def uniform(p1, p2, rng, out):
+    """Uniform crossover: every gene from either parent with probability 1/2"""
+    np.copyto(out, p2)
+    np.copyto(out, p1, where=rng.random(size=out.shape) < 0.5)
+
+
+# ----------------------------
+# Mutation
+# ----------------------------
+def gaussian(x, lower, upper, rng, out, p, scale=0.1):
+    """Gaussian perturbation with σ = scale * (upper - lower) per gene"""
+    sites = np.unravel_index(sample_sites(x.shape, p, rng), x.shape)
+    out.fill(False)
+    out[sites] = True
+    x[sites] += rng.standard_normal(len(sites[0])) * (scale * (upper - lower)[sites[-1]])
+
+
+def polynomial(x, lower, upper, rng, out, p, eta=20.0):
+    """Bounded polynomial mutation with distribution index eta"""
+    sites = np.unravel_index(sample_sites(x.shape, p, rng), x.shape)
+    cols = sites[-1]
+    out.fill(False)
+    out[sites] = True
+    y = x[sites]
+    span = (upper - lower)[cols]
+    u = rng.random(size=len(cols))
+    left = u < 0.5
+    # Distance to the bound on the side the gene moves to
+    gap = np.where(left, y - lower[cols], upper[cols] - y) / span
+    xy = (1 - gap) ** (eta + 1)
+    val = np.where(left, 2 * u + (1 - 2 * u) * xy, 2 * (1 - u) + 2 * (u - 0.5) * xy)
+    root = val ** (1 / (eta + 1))
+    x[sites] = y + np.where(left, root - 1, 1 - root) * span
+
+
+def self_adaptive(x, lower, upper, rng, out, p):
+    """
+    Gaussian mutation with a self-adapted step size per individual
+
+    The last column of x (and of lower and upper) holds the individual's
+    step size σ as a fraction of the domain width. σ is first multiplied by
+    exp(τ·N(0, 1)) with τ = 1/sqrt(dim), then the genes mutate with the new
+    σ. Step sizes are recombined and selected with the individuals they
+    belong to.
+    """
+    genes = x.shape[:-1] + (x.shape[-1] - 1,)
+    sigma = x[..., -1]
+    sigma *= np.exp(rng.normal(0, 1, size=sigma.shape) / np.sqrt(genes[-1]))
+    sites = np.unravel_index(sample_sites(genes, p, rng), genes)
+    out.fill(False)
+    out[sites] = True
+    x[sites] += rng.standard_normal(len(sites[0])) * sigma[sites[:-1]] * (upper - lower)[sites[-1]]
+
+# The engine appends the σ column for mutations with this flag
+self_adaptive.self_adaptive = True
+
+
+# ----------------------------
+# Registries
+# ----------------------------
+SELECTION = {"tournament": tournament, "sus": sus}
+CROSSOVER = {"blend": blend, "blx_alpha": blx_alpha, "sbx": sbx, "uniform": uniform}
+MUTATION = {"gaussian": gaussian, "polynomial": polynomial, "self_adaptive": self_adaptive}
+
+
+def get_operator(registry, op):
+    """Look up op by name in registry; callables are returned unchanged"""
+    if callable(op):
+        return op
+    if op not in registry:
+        raise ValueError(f"Unknown operator {op!r}, expected one of {sorted(registry)}")
+    return registry[op]
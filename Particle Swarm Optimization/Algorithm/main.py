@@ -1,6 +1,11 @@
+import os
+import sys
 import numpy as np
-import pandas as pd
 from benchfunc import funcs_vec
+# benchmark.py, the sweep runner shared by the GA and PSO harnesses, is in
+# the repository root
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir))
+from benchmark import run_benchmark, open_result_store, RunTimer, default_checkpoints, save_traces
 from IPython.display import display
 
 # ----------------------------
@@ -14,12 +19,26 @@ C2 = 1.42
 W = 0.74
 N_RUNS = 20
 
-rng_global = np.random.default_rng()
+# Benchmark sweep: root seed (None for a fresh one), worker processes
+# (None for all cores) and runs per job chunk
+SEED = None
+N_WORKERS = None
+CHUNK_SIZE = 5
+# Measure the peak memory of every chunk (about twice as slow)
+TRACE_MEMORY = False
+# Evaluation counts at which every run's best-so-far value is traced
+CHECKPOINTS = default_checkpoints(POP_SIZE, MAX_EVALS)
+# Per-run results are appended here as they finish; a rerun skips the
+# runs already stored (delete the store to start over)
+RESULTS_STORE = "pso_benchmark_results"
 
 # ----------------------------
 # PSO Algorithm
 # ----------------------------
-def run_pso(func_vec, lower, upper, seed=None):
+def run_pso(func_vec, lower, upper, seed=None, timings=None, trace=None):
+    # timings: optional dict filled with timing counters (see RunTimer)
+    # trace: optional ConvergenceTrace of the global best value
+    timer = RunTimer(timings)
     rng = np.random.default_rng(seed)
     dim = int(lower.shape[0])  # Handle numpy array shape
 
@@ -28,7 +47,7 @@ def run_pso(func_vec, lower, upper, seed=None):
     vel = rng.uniform(-abs(upper-lower), abs(upper-lower), size=(POP_SIZE, dim)) * 0.1
 
     # evaluate initial fitness
-    fitnesses = func_vec(pos)
+    fitnesses = timer.evaluate(func_vec, pos)
     evals = POP_SIZE
 
     # personal bests
@@ -39,6 +58,8 @@ def run_pso(func_vec, lower, upper, seed=None):
     g_idx = int(np.argmin(pbest_val))
     gbest_pos = pbest_pos[g_idx].copy()
     gbest_val = float(pbest_val[g_idx])
+    if trace is not None:
+        trace.record(evals, gbest_val)
 
     # iterations
     for it in range(MAX_ITERS):
@@ -54,7 +75,7 @@ def run_pso(func_vec, lower, upper, seed=None):
         pos = np.clip(pos, lower, upper)
 
         # evaluate
-        fitnesses = func_vec(pos)
+        fitnesses = timer.evaluate(func_vec, pos)
         evals += POP_SIZE
 
         # update personal best
@@ -67,81 +88,117 @@ def run_pso(func_vec, lower, upper, seed=None):
         if pbest_val[min_idx] < gbest_val:
             gbest_val = float(pbest_val[min_idx])
             gbest_pos = pbest_pos[min_idx].copy()
+        if trace is not None:
+            trace.record(evals, gbest_val)
 
         if evals >= MAX_EVALS:
             break
 
+    timer.finish(evals)
+    return gbest_val, gbest_pos
+
+def run_pso_batched(func_vec, lower, upper, n_runs, seeds=None, timings=None, trace=None):
+    """
+    Run n_runs independent swarms at once
+
+    Positions, velocities and personal bests of all runs are kept in
+    (n_runs, POP_SIZE, dim) arrays and every run follows its own global
+    best. Fitness is evaluated with one func_vec call per iteration on the
+    flattened (n_runs * POP_SIZE, dim) positions. The random draws of all
+    runs come from one generator seeded with seeds, so results are
+    reproducible but differ from run_pso.
+
+    Args:
+        func_vec: Vectorized objective, reducing over the last axis
+        lower, upper: Bounds of the search space, shape (dim,)
+        n_runs: Number of independent runs
+        seeds: Seed (or sequence of seeds) of the random generator
+        timings: Optional dict filled with the timing counters of all runs
+            together (see RunTimer)
+        trace: Optional ConvergenceTrace with one row per run
+
+    Returns:
+        Tuple of the global best values, shape (n_runs,), and positions,
+        shape (n_runs, dim)
+    """
+    timer = RunTimer(timings)
+    rng = np.random.default_rng(seeds)
+    dim = int(lower.shape[0])
+    runs = np.arange(n_runs)
+
+    # init positions and velocities
+    pos = rng.uniform(lower, upper, size=(n_runs, POP_SIZE, dim))
+    vel = rng.uniform(-abs(upper-lower), abs(upper-lower), size=(n_runs, POP_SIZE, dim)) * 0.1
+
+    # evaluate initial fitness
+    fitnesses = np.asarray(timer.evaluate(func_vec, pos.reshape(-1, dim))).reshape(n_runs, POP_SIZE)
+    evals = POP_SIZE
+
+    # personal bests
+    pbest_pos = pos.copy()
+    pbest_val = fitnesses.copy()
+
+    # global best of every run
+    g_idx = np.argmin(pbest_val, axis=1)
+    gbest_pos = pbest_pos[runs, g_idx]
+    gbest_val = pbest_val[runs, g_idx]
+    if trace is not None:
+        trace.record(evals, gbest_val)
+
+    # iterations
+    for it in range(MAX_ITERS):
+        # velocity update
+        r1 = rng.random(size=(n_runs, POP_SIZE, dim))
+        r2 = rng.random(size=(n_runs, POP_SIZE, dim))
+        vel = (W*vel 
+               + C1*r1*(pbest_pos - pos) 
+               + C2*r2*(gbest_pos[:, None, :] - pos))
+
+        # position update
+        pos = pos + vel
+        pos = np.clip(pos, lower, upper)
+
+        # evaluate
+        fitnesses = np.asarray(timer.evaluate(func_vec, pos.reshape(-1, dim))).reshape(n_runs, POP_SIZE)
+        evals += POP_SIZE
+
+        # update personal best
+        better_mask = fitnesses < pbest_val
+        pbest_pos[better_mask] = pos[better_mask]
+        pbest_val[better_mask] = fitnesses[better_mask]
+
+        # update global best of every run
+        min_idx = np.argmin(pbest_val, axis=1)
+        improved = pbest_val[runs, min_idx] < gbest_val
+        gbest_val = np.where(improved, pbest_val[runs, min_idx], gbest_val)
+        gbest_pos = np.where(improved[:, None], pbest_pos[runs, min_idx], gbest_pos)
+        if trace is not None:
+            trace.record(evals, gbest_val)
+
+        if evals >= MAX_EVALS:
+            break
+
+    timer.finish(evals * n_runs)
     return gbest_val, gbest_pos
 
 # ----------------------------
 # Run Experiments
 # ----------------------------
-summary_rows = []
-all_results = []
-print("Starting PSO runs...")
-
-for name, fvec, lower, upper, known in funcs_vec:
-    best_vals = np.empty(N_RUNS)
-    best_xs = []
-    
-    for i in range(N_RUNS):
-        seed = rng_global.integers(1_000_000_000)
-        try:
-            bv, bx = run_pso(fvec, lower, upper, seed=seed)
-        except Exception as e:
-            print(f"  Skipping run due to error evaluating {name}: {e}")
-            bv, bx = np.nan, None
-        best_vals[i] = bv
-        best_xs.append(bx)
-    
-    # Handle case where all runs failed
-    valid_vals = best_vals[~np.isnan(best_vals)]
-    if len(valid_vals) > 0:
-        meanv = float(np.nanmean(best_vals))
-        stdv = float(np.nanstd(best_vals, ddof=1)) if len(valid_vals) > 1 else 0.0
-        idx_best = int(np.nanargmin(best_vals))
-        best_observed_val = float(best_vals[idx_best])
-        best_observed_x = np.round(best_xs[idx_best], 6).tolist() if best_xs[idx_best] is not None else None
-    else:
-        meanv = np.nan
-        stdv = np.nan
-        best_observed_val = np.nan
-        best_observed_x = None
-    
-    summary_rows.append({
-        "function": name,
-        "mean_best": round(meanv, 6) if not np.isnan(meanv) else np.nan,
-        "std_best": round(stdv, 6) if not np.isnan(stdv) else np.nan,
-        "best_observed_val": best_observed_val,
-        "best_observed_x": best_observed_x,
-        "known_min": known
-    })
-    
-    all_results.append({"function": name, "best_vals": best_vals, "best_xs": best_xs})
-    
-    if len(valid_vals) > 0:
-        print(f"{name}: mean={meanv:.6g}, std={stdv:.6g}, best={np.nanmin(best_vals):.6g}")
-    else:
-        print(f"{name}: All runs failed - no valid results")
-
-df = pd.DataFrame(summary_rows)
-display(df)
-
-# Per-run results
-rows = []
-for r in all_results:
-    row = {"function": r["function"]}
-    for i, val in enumerate(r["best_vals"], start=1):
-        if not np.isnan(val):
-            row[f"run_{i}"] = float(np.round(val, 8))
-        else:
-            row[f"run_{i}"] = np.nan
-    rows.append(row)
-
-df_runs = pd.DataFrame(rows)
-display(df_runs)
-
-# Save summary CSV
-csv_path = "pso_benchmark_results_summary.csv"
-df.to_csv(csv_path, index=False)
-print("Saved summary CSV to:", csv_path)
+if __name__ == "__main__":
+    print("Starting PSO runs...")
+    store = open_result_store(RESULTS_STORE)
+    df, df_runs, traces = run_benchmark(run_pso_batched, funcs_vec, N_RUNS, store, seed=SEED,
+                                max_workers=N_WORKERS, chunk_size=CHUNK_SIZE,
+                                trace_memory=TRACE_MEMORY, checkpoints=CHECKPOINTS)
+    display(df)
+    display(df_runs)
+
+    # Save summary CSV
+    csv_path = "pso_benchmark_results_summary.csv"
+    df.to_csv(csv_path, index=False)
+    print("Saved summary CSV to:", csv_path)
+
+    # Save convergence traces next to the CSV
+    traces_path = "pso_benchmark_traces.npz"
+    save_traces(traces_path, CHECKPOINTS, traces)
+    print("Saved convergence traces to:", traces_path)
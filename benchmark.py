@@ -0,0 +1,486 @@
+# benchmark.py - process-pool runner for the benchmark sweep over funcs_vec,
+# shared by the GA and PSO harnesses (their main.py add this directory to
+# sys.path)
+import os
+import json
+import base64
+import glob
+import time
+import tracemalloc
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, CancelledError, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# Environment variables that limit the thread pools of the BLAS / OpenMP
+# libraries NumPy may be linked against
+BLAS_THREAD_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS",
+                    "VECLIB_MAXIMUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+# Additive timing counters of a run, see RunTimer
+TIMING_FIELDS = ("total_time", "eval_time", "operator_time", "evals")
+
+# Precision levels of the ECDF targets, relative to the gap between the
+# median first-checkpoint value and the optimum
+TARGET_PRECISIONS = np.logspace(0, -8, 41)
+
+
+class RunTimer:
+    """
+    Timing counters of one optimizer call
+
+    Objective calls go through evaluate(), which accumulates their time;
+    the rest of the wall time is operator overhead. When a timings dict is
+    given, finish() fills it with total_time, eval_time, operator_time
+    (seconds), evals, evals_per_s and peak_memory_mb. Peak memory is only
+    measured while tracemalloc is tracing (it roughly doubles the run
+    time), otherwise it is nan.
+    """
+
+    def __init__(self, timings=None):
+        self.timings = timings
+        self.eval_time = 0.0
+        if timings is not None and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        self._start = time.perf_counter()
+
+    def evaluate(self, func, X):
+        start = time.perf_counter()
+        values = func(X)
+        self.eval_time += time.perf_counter() - start
+        return values
+
+    def finish(self, evals):
+        if self.timings is None:
+            return
+        total = time.perf_counter() - self._start
+        peak = tracemalloc.get_traced_memory()[1] / 2**20 if tracemalloc.is_tracing() else np.nan
+        self.timings.update(total_time=total, eval_time=self.eval_time,
+                            operator_time=total - self.eval_time, evals=evals,
+                            evals_per_s=evals / total if total > 0 else np.nan,
+                            peak_memory_mb=peak)
+
+
+def default_checkpoints(first, max_evals, n=50):
+    """n (or fewer) log-spaced evaluation counts from first to max_evals"""
+    return np.unique(np.geomspace(first, max_evals, n).astype(np.int64))
+
+
+class ConvergenceTrace:
+    """
+    Best-so-far values of one or more runs at evaluation checkpoints, kept
+    in a preallocated float32 array of shape (n_runs, len(checkpoints))
+
+    The optimizer calls record() after every evaluation batch; each
+    checkpoint gets the best value known once that many evaluations are
+    done, so its resolution is one batch. Runs may have different
+    evaluation counts.
+    """
+
+    def __init__(self, checkpoints, n_runs=1):
+        self.checkpoints = np.asarray(checkpoints, dtype=np.int64)
+        self.values = np.full((n_runs, len(self.checkpoints)), np.nan, dtype=np.float32)
+        self._next = np.zeros(n_runs, dtype=np.int64)
+
+    def record(self, evals, best):
+        """
+        Fill the checkpoints reached by evals with best; both are scalars
+        or per-run arrays
+        """
+        n_runs = len(self._next)
+        stop = np.broadcast_to(np.searchsorted(self.checkpoints, evals, side="right"), n_runs)
+        if (stop <= self._next).all():
+            return
+        cols = np.arange(len(self.checkpoints))
+        rows, cols = np.nonzero((cols >= self._next[:, None]) & (cols < stop[:, None]))
+        self.values[rows, cols] = np.broadcast_to(best, n_runs)[rows]
+        self._next = np.maximum(self._next, stop)
+
+
+def ecdf(traces, known=None):
+    """
+    Empirical cumulative distribution of the runs' progress
+
+    Targets are f_opt + TARGET_PRECISIONS * (f_start - f_opt), with f_opt
+    the known minimum (or the best traced value) and f_start the median
+    value at the first checkpoint.
+
+    Args:
+        traces: Array of shape (n_runs, n_checkpoints) of best-so-far values
+        known: Known minimum, used if it is a finite number
+
+    Returns:
+        Fraction of the (run, target) pairs reached at every checkpoint
+    """
+    valid = traces[~np.isnan(traces).any(axis=1)].astype(float)
+    if not len(valid):
+        return np.full(traces.shape[1], np.nan)
+    f_opt = known if isinstance(known, (int, float)) and np.isfinite(known) else valid.min()
+    f_start = max(float(np.median(valid[:, 0])), f_opt)
+    targets = f_opt + TARGET_PRECISIONS * (f_start - f_opt)
+    reached = valid[:, :, None] <= targets
+    return reached.mean(axis=(0, 2))
+
+
+def save_traces(path, checkpoints, traces):
+    """
+    Save the convergence traces of a sweep as one compressed .npz file
+
+    The file holds the "checkpoints" array and one float32 array of shape
+    (n_runs, n_checkpoints) per function, keyed by the function name.
+    """
+    np.savez_compressed(path, checkpoints=np.asarray(checkpoints), **traces)
+
+
+class JsonlResultStore:
+    """
+    Append-only store of per-run results, one JSON object per line
+
+    Every record is a dict with the keys "function", "run", "best_val"
+    (None for a failed run), "best_x", "error", the run's share of the
+    timing counters of its chunk (TIMING_FIELDS), the chunk's
+    "peak_memory_mb" and the run's convergence "trace" (float32 bytes,
+    stored base64 encoded). Each append is flushed
+    to disk, so a crash loses at most the chunk being written; a truncated
+    last line is skipped when reading.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def append(self, records):
+        with open(self.path, "a+b") as f:
+            # Start on a new line after a line truncated by a crash
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+            for record in records:
+                if record.get("trace") is not None:
+                    record = {**record, "trace": base64.b64encode(record["trace"]).decode()}
+                f.write((json.dumps(record) + "\n").encode())
+            f.flush()
+            os.fsync(f.fileno())
+
+    def records(self):
+        """Iterate over the stored records without loading the whole file"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get("trace") is not None:
+                    record["trace"] = base64.b64decode(record["trace"])
+                yield record
+
+    def completed(self):
+        """
+        Set of the (function, run) pairs already stored with a result;
+        failed runs are not included, so a resumed sweep retries them
+        """
+        return {(r["function"], r["run"]) for r in self.records() if r.get("error") is None}
+
+
+class ParquetResultStore(JsonlResultStore):
+    """
+    Append-only store of per-run results as a directory of Parquet files
+
+    Every append writes one file (a single row group) under a temporary
+    name and renames it into place, so files are either complete or
+    absent. Records are read back one row group at a time.
+    """
+
+    schema = None if pa is None else pa.schema([
+        ("function", pa.string()),
+        ("run", pa.int64()),
+        ("best_val", pa.float64()),
+        ("best_x", pa.list_(pa.float64())),
+        ("error", pa.string()),
+    ] + [(field, pa.float64()) for field in TIMING_FIELDS + ("peak_memory_mb",)]
+      + [("trace", pa.binary())])
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def append(self, records):
+        records = list(records)
+        if not records:
+            return
+        part = len(glob.glob(os.path.join(self.path, "part-*.parquet")))
+        name = os.path.join(self.path, f"part-{part:06d}-{os.getpid()}.parquet")
+        table = pa.Table.from_pylist(records, schema=self.schema)
+        pq.write_table(table, name + ".tmp")
+        os.replace(name + ".tmp", name)
+
+    def records(self):
+        for name in sorted(glob.glob(os.path.join(self.path, "part-*.parquet"))):
+            parquet_file = pq.ParquetFile(name)
+            for group in range(parquet_file.num_row_groups):
+                yield from parquet_file.read_row_group(group).to_pylist()
+
+
+def open_result_store(path):
+    """
+    Open the result store at path: a directory of Parquet files if pyarrow
+    is installed, otherwise the JSON-lines file path + ".jsonl"
+    """
+    if pa is not None:
+        return ParquetResultStore(path)
+    return JsonlResultStore(path + ".jsonl")
+
+
+def make_jobs(funcs, n_runs, seed=None, chunk_size=5, completed=()):
+    """
+    Split the (function, run) jobs of a sweep into chunks
+
+    Every run gets its own SeedSequence, spawned from seed per function and
+    per run. The runs of a function are always grouped into the same chunks
+    of chunk_size consecutive runs, seeded from the entropy of their runs,
+    so with equal seed and chunk_size a run gets the same result whether or
+    not the sweep was interrupted. Chunks whose runs are all listed in
+    completed as (function name, run) are left out; the others are run
+    whole and only their pending runs are kept.
+
+    Returns:
+        List of (function index, run indices, seed entropy, pending mask)
+        tuples, one per chunk of at most chunk_size runs of the same function
+    """
+    func_seeds = np.random.SeedSequence(seed).spawn(len(funcs))
+    jobs = []
+    for f, func_seed in enumerate(func_seeds):
+        run_seeds = func_seed.spawn(n_runs)
+        for start in range(0, n_runs, chunk_size):
+            runs = np.arange(start, min(start + chunk_size, n_runs))
+            pending = np.array([(funcs[f][0], int(r)) not in completed for r in runs])
+            if not pending.any():
+                continue
+            entropy = np.concatenate([run_seeds[r].generate_state(2) for r in runs])
+            jobs.append((f, runs, entropy, pending))
+    return jobs
+
+
+def _run_chunk(run_batch, func, lower, upper, n_runs, entropy, trace_memory, checkpoints):
+    """Run one chunk of runs of a function in a worker process"""
+    timings = {}
+    trace = ConvergenceTrace(checkpoints, n_runs) if checkpoints is not None else None
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        best_vals, best_xs = run_batch(func, lower, upper, n_runs, seeds=entropy,
+                                       timings=timings, trace=trace)
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    traces = trace.values if trace is not None else [None] * n_runs
+    return np.asarray(best_vals, dtype=float), np.asarray(best_xs), timings, traces
+
+
+def run_benchmark(run_batch, funcs, n_runs, store, seed=None, max_workers=None, chunk_size=5,
+                  trace_memory=False, checkpoints=None):
+    """
+    Run every function of funcs n_runs times on a pool of processes
+
+    The (function, run) jobs are grouped into chunks of chunk_size runs of
+    one function; each chunk is a single run_batch call in a worker. Workers
+    are started with BLAS threading pinned to one thread, so max_workers
+    processes use max_workers cores. With equal seed and chunk_size the
+    results do not depend on the number of workers.
+
+    Results are appended to store as soon as a chunk finishes, and runs the
+    store already holds are skipped, so an interrupted sweep resumes where
+    it stopped (keep seed and chunk_size fixed to resume with the same
+    per-run results). Runs that raised an error are stored as failed and
+    retried by the next sweep; runs lost with a failed worker pool (a
+    crashed or killed worker) are not stored at all.
+
+    Args:
+        run_batch: Batched optimizer called as
+            run_batch(func, lower, upper, n_runs, seeds=..., timings=...,
+            trace=...), returning the best values (n_runs,) and best
+            positions (n_runs, dim) and filling timings (see RunTimer) and
+            trace (see ConvergenceTrace, may be None); it must be importable
+            by the workers (defined at module level)
+        funcs: List of (name, function, lower, upper, known_min)
+        n_runs: Independent runs per function
+        store: Result store, see open_result_store
+        seed: Root seed of the per-job SeedSequences
+        max_workers: Number of worker processes (default: all cores)
+        chunk_size: Runs per job chunk
+        trace_memory: Measure the peak memory of every chunk with
+            tracemalloc (slows the runs down about twice)
+        checkpoints: Evaluation counts at which the best-so-far value of
+            every run is traced; None records no traces
+
+    Returns:
+        Tuple of the summary DataFrame, the per-run DataFrame and a dict
+        of the traces of every function (see summarize)
+    """
+    jobs = make_jobs(funcs, n_runs, seed, chunk_size, store.completed())
+
+    # Spawned workers import NumPy afresh and see the pinned thread counts
+    saved = {var: os.environ.get(var) for var in BLAS_THREAD_VARS}
+    os.environ.update({var: "1" for var in BLAS_THREAD_VARS})
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 mp_context=mp.get_context("spawn")) as executor:
+            futures = {}
+            for f, runs, entropy, pending in jobs:
+                name, func, lower, upper, known = funcs[f]
+                future = executor.submit(_run_chunk, run_batch, func, lower, upper,
+                                         len(runs), entropy, trace_memory, checkpoints)
+                futures[future] = (name, runs, pending)
+
+            # Store every chunk as soon as it is done
+            for future in as_completed(futures):
+                name, runs, pending = futures[future]
+                try:
+                    vals, xs, timings, traces = future.result()
+                except (BrokenProcessPool, CancelledError) as e:
+                    # The pool failed, not the runs: leave them out of the
+                    # store so that the next sweep runs them
+                    print(f"  Runs of {name} lost with the worker pool, rerun to retry: {e!r}")
+                    continue
+                except Exception as e:
+                    print(f"  Skipping runs due to error evaluating {name}: {e}")
+                    store.append({"function": name, "run": int(r), "best_val": None,
+                                  "best_x": None, "error": str(e)} for r in runs[pending])
+                    continue
+
+                # The runs of a chunk share its time and memory
+                shares = {field: timings[field] / len(runs) for field in TIMING_FIELDS}
+                shares["peak_memory_mb"] = timings["peak_memory_mb"]
+                store.append({"function": name, "run": int(r), "best_val": float(v),
+                              "best_x": [float(xi) for xi in x], "error": None, **shares,
+                              "trace": t.tobytes() if t is not None else None}
+                             for r, v, x, t, keep in zip(runs, vals, xs, traces, pending) if keep)
+    finally:
+        for var, value in saved.items():
+            if value is None:
+                os.environ.pop(var, None)
+            else:
+                os.environ[var] = value
+
+    return summarize(funcs, n_runs, store.records(), checkpoints)
+
+
+def summarize(funcs, n_runs, records, checkpoints=None):
+    """
+    Build the summary and per-run DataFrames of a sweep from a stream of
+    stored records
+
+    Only the best values of every run, the best position of every
+    function and its summed timing counters are kept while the records are
+    read. The summary gets the extra columns total_time_s, eval_time_s,
+    operator_time_s, evals_per_s and peak_memory_mb: times summed
+    over the runs, evaluations per second of the whole sweep of the
+    function, and the largest peak memory of its chunks. With checkpoints
+    it also gets ecdf_final, the fraction of ECDF targets reached at the
+    end, and ecdf_auc, the area under the ECDF over the checkpoints
+    (normalized to [0, 1]; log-spaced checkpoints weigh early progress as
+    much as late progress).
+
+    Args:
+        funcs: List of (name, function, lower, upper, known_min)
+        n_runs: Independent runs per function
+        records: Iterable of result records, see JsonlResultStore
+        checkpoints: Checkpoints of the stored traces, None to ignore them
+
+    Returns:
+        Tuple of the summary DataFrame, the per-run DataFrame and a dict
+        mapping every function name to its (n_runs, len(checkpoints))
+        float32 traces (nan for missing runs; empty without checkpoints)
+    """
+    index = {name: f for f, (name, *_) in enumerate(funcs)}
+    all_vals = np.full((len(funcs), n_runs), np.nan)
+    best_observed = np.full(len(funcs), np.inf)
+    best_positions = [None] * len(funcs)
+    counters = np.zeros((len(funcs), len(TIMING_FIELDS)))
+    peak_memory = np.full(len(funcs), np.nan)
+    traces = {}
+    if checkpoints is not None:
+        traces = {name: np.full((n_runs, len(checkpoints)), np.nan, dtype=np.float32)
+                  for name, *_ in funcs}
+    for record in records:
+        f = index.get(record["function"])
+        run = record["run"]
+        if f is None or run >= n_runs or record["best_val"] is None:
+            continue
+        val = record["best_val"]
+        all_vals[f, run] = val
+        counters[f] += [record.get(field) or 0.0 for field in TIMING_FIELDS]
+        if record.get("peak_memory_mb") is not None and not np.isnan(record["peak_memory_mb"]):
+            peak_memory[f] = np.fmax(peak_memory[f], record["peak_memory_mb"])
+        trace = record.get("trace")
+        if traces and trace is not None and len(trace) == 4 * len(checkpoints):
+            traces[funcs[f][0]][run] = np.frombuffer(trace, dtype=np.float32)
+        if best_positions[f] is None or val < best_observed[f]:
+            best_observed[f] = val
+            best_positions[f] = record["best_x"]
+
+    summary_rows = []
+    for f, (name, func, low, high, known) in enumerate(funcs):
+        best_vals = all_vals[f]
+
+        # Handle case where all runs failed
+        valid_vals = best_vals[~np.isnan(best_vals)]
+        if len(valid_vals) > 0:
+            meanv = float(np.nanmean(best_vals))
+            stdv = float(np.nanstd(best_vals, ddof=1)) if len(valid_vals) > 1 else 0.0
+            best_observed_val = float(np.nanmin(best_vals))
+            best_observed_x = np.round(best_positions[f], 6).tolist() if best_positions[f] is not None else None
+        else:
+            meanv = np.nan
+            stdv = np.nan
+            best_observed_val = np.nan
+            best_observed_x = None
+
+        summary_rows.append({
+            "function": name,
+            "mean_best": round(meanv, 6) if not np.isnan(meanv) else np.nan,
+            "std_best": round(stdv, 6) if not np.isnan(stdv) else np.nan,
+            "best_observed_val": best_observed_val,
+            "best_observed_x": best_observed_x,
+            "known_min": known
+        })
+
+        total_time, eval_time, operator_time, evals = counters[f]
+        summary_rows[-1].update({
+            "total_time_s": round(total_time, 6),
+            "eval_time_s": round(eval_time, 6),
+            "operator_time_s": round(operator_time, 6),
+            "evals_per_s": round(evals / total_time, 1) if total_time > 0 else np.nan,
+            "peak_memory_mb": round(peak_memory[f], 3) if not np.isnan(peak_memory[f]) else np.nan
+        })
+        if traces:
+            curve = ecdf(traces[name], known)
+            summary_rows[-1]["ecdf_final"] = round(float(curve[-1]), 4)
+            summary_rows[-1]["ecdf_auc"] = round(float(np.mean(curve)), 4)
+
+        if len(valid_vals) > 0:
+            print(f"{name}: mean={meanv:.6g}, std={stdv:.6g}, best={np.nanmin(best_vals):.6g}")
+        else:
+            print(f"{name}: All runs failed - no valid results")
+
+    # per-run table
+    rows = []
+    for (name, *_), best_vals in zip(funcs, all_vals):
+        row = {"function": name}
+        for i, val in enumerate(best_vals, start=1):
+            if not np.isnan(val):
+                row[f"run_{i}"] = float(np.round(val, 8))
+            else:
+                row[f"run_{i}"] = np.nan
+        rows.append(row)
+
+    return pd.DataFrame(summary_rows), pd.DataFrame(rows), traces